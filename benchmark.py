@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Benchmarks the time taken to import pyasx and load its configuration. Each
+sample is run in a fresh interpreter so nothing is already imported/cached.
+
+    python3 benchmark.py [samples]
+"""
+
+
+import subprocess
+import sys
+
+
+# code timed in each fresh interpreter, prints the elapsed time in ms
+SAMPLE_CODE = """
+import time
+started = time.perf_counter()
+import pyasx.data.companies
+import pyasx.data.securities
+imported = time.perf_counter()
+pyasx.config.get('asx_company_json')
+configured = time.perf_counter()
+print('%f %f' % ((imported - started) * 1000, (configured - imported) * 1000))
+"""
+
+
+def run_sample():
+
+    output = subprocess.check_output([sys.executable, "-c", SAMPLE_CODE])
+    import_ms, config_ms = output.decode().split()
+
+    return float(import_ms), float(config_ms)
+
+
+def median(values):
+
+    values = sorted(values)
+    middle = len(values) // 2
+
+    if len(values) % 2:
+        return values[middle]
+
+    return (values[middle - 1] + values[middle]) / 2
+
+
+def main():
+
+    num_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    samples = [run_sample() for i in range(0, num_samples)]
+
+    print("import pyasx.data.*   median %.2fms" % median([sample[0] for sample in samples]))
+    print("first config.get()    median %.2fms" % median([sample[1] for sample in samples]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Caches for lookups made via `pyasx.client.Client`.
+"""
+
+
+import concurrent.futures
+import hashlib
+import threading
+import time
+
+
+class TTLCache(object):
+    """
+    Caches lookup results for a fixed time to live. Safe to share between
+    threads, at worst two threads may both load the same expired entry.
+
+    With a `max_size`, expired entries are swept out once the cache is full,
+    then if still full the oldest entries are evicted, so a long running
+    process looking up many different keys doesn't grow without bound.
+    """
+
+
+    def __init__(self, ttl=60, clock=time.time, max_size=None):
+        """
+        :param ttl: Seconds a cached lookup is used for before being reloaded
+        :param clock: Function returning the current time, in seconds
+        :param max_size: Maximum number of entries, None for no limit
+        """
+
+        self.ttl = ttl
+        self.clock = clock
+        self.max_size = max_size
+
+        self._entries = {}  # key -> (time loaded, value)
+
+
+    def __len__(self):
+
+        return len(self._entries)
+
+
+    def get_or_load(self, key, load):
+        """
+        Return the cached value for the given key, calling `load()` to
+        (re)load it if it isn't cached or has expired.
+        """
+
+        entry = self._entries.get(key)
+
+        if entry is not None and self.clock() - entry[0] < self.ttl:
+            return entry[1]
+
+        value = load()
+        self._store(key, value)
+
+        return value
+
+
+    def clear(self):
+        """
+        Remove all cached values.
+        """
+
+        self._entries = {}
+
+
+    def _store(self, key, value):
+
+        self._entries[key] = (self.clock(), value)
+
+        if self.max_size is not None and len(self._entries) > self.max_size:
+            self._sweep()
+
+
+    def _sweep(self):
+        """
+        Remove the expired entries, then the oldest entries until there is room
+        for a tenth more, so sweeps are infrequent.
+        """
+
+        now = self.clock()
+        max_age = self._max_age()
+
+        for key, entry in list(self._entries.items()):
+            if now - entry[0] >= max_age:
+                self._entries.pop(key, None)
+
+        excess = len(self._entries) - self.max_size * 9 // 10
+
+        if excess > 0:
+
+            entries = sorted(self._entries.items(), key=lambda item: item[1][0])
+
+            for key, entry in entries[:excess]:
+                self._entries.pop(key, None)
+
+
+    def _max_age(self):
+        """
+        :return: Seconds after which an entry is never served
+        """
+
+        return self.ttl
+
+
+class StaleWhileRevalidateCache(TTLCache):
+    """
+    Caches lookup results, serving them stale while they are refreshed in the
+    background. Entries older than the soft TTL are returned immediately while
+    a background refresh is started, only once they are older than the hard TTL
+    do callers block on reloading them.
+
+    If a background refresh fails the stale entry keeps being served, & the
+    refresh is retried by the next lookup, until the hard TTL is reached.
+    """
+
+
+    def __init__(self, soft_ttl=30, hard_ttl=300, max_refreshes=4, clock=time.time, max_size=None):
+        """
+        :param soft_ttl: Seconds before a cached lookup is refreshed in the background
+        :param hard_ttl: Seconds before a cached lookup is too stale to be served
+        :param max_refreshes: Maximum number of concurrent background refreshes
+        :param clock: Function returning the current time, in seconds
+        :param max_size: Maximum number of entries, None for no limit
+        """
+
+        super(StaleWhileRevalidateCache, self).__init__(soft_ttl, clock, max_size)
+
+        self.hard_ttl = hard_ttl
+        self.max_refreshes = max_refreshes
+
+        self._lock = threading.Lock()
+        self._refreshing = set()  # keys currently being refreshed
+        self._executor = None
+
+
+    def get_or_load(self, key, load):
+        """
+        Return the cached value for the given key, refreshing it in the
+        background if it is past the soft TTL. Calls `load()` directly if it
+        isn't cached or is past the hard TTL.
+        """
+
+        entry = self._entries.get(key)
+
+        if entry is not None:
+
+            age = self.clock() - entry[0]
+
+            if age < self.ttl:
+                return entry[1]
+
+            if age < self.hard_ttl:
+                self._refresh(key, load)
+                return entry[1]
+
+        value = load()
+        self._store(key, value)
+
+        return value
+
+
+    def _max_age(self):
+
+        return self.hard_ttl
+
+
+    def _refresh(self, key, load):
+
+        with self._lock:
+
+            # skip if already being refreshed, or too many refreshes are already
+            # running (the next lookup will try again)
+            if key in self._refreshing or len(self._refreshing) >= self.max_refreshes:
+                return
+
+            self._refreshing.add(key)
+
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_refreshes
+                )
+
+        self._executor.submit(self._run_refresh, key, load)
+
+
+    def _run_refresh(self, key, load):
+
+        try:
+
+            value = load()
+            self._store(key, value)
+
+        except Exception:
+            # keep serving the stale entry, retried on the next lookup
+
+            pass
+
+        finally:
+
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+class PayloadMemo(object):
+    """
+    Remembers the normalised result of the last payload pulled from each
+    endpoint, keyed on a hash of the raw response body. A payload byte identical
+    to the last one skips JSON decoding & normalising, and resolves to the very
+    same result object. Safe to share between threads.
+
+    It also remembers the result last returned for each endpoint, so lookups
+    can be flagged unchanged whether their result came from an identical
+    payload, the client's cache or a coalesced request.
+    """
+
+
+    def __init__(self):
+
+        self._entries = {}  # key -> (digest of the body, normalised result)
+        self._returned = {}  # key -> result last returned
+
+
+    def __len__(self):
+
+        return len(self._entries)
+
+
+    def resolve(self, key, body, normalise):
+        """
+        Return the result of `normalise(body)`, reusing the last result for the
+        given key if the body is unchanged.
+        :param key: Uniquely identifies the endpoint, i.e. its URL
+        :param body: The raw response body, as bytes
+        """
+
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+
+        entry = self._entries.get(key)
+
+        if entry is not None and entry[0] == digest:
+            return entry[1]
+
+        value = normalise(body)
+        self._entries[key] = (digest, value)
+
+        return value
+
+
+    def returned(self, key, value):
+        """
+        Record the result being returned for the given key.
+        :return: Whether it is the same result as was last returned
+        """
+
+        unchanged = self._returned.get(key) is value
+        self._returned[key] = value
+
+        return unchanged
+
+
+    def clear(self):
+        """
+        Forget all of the remembered payloads.
+        """
+
+        self._entries = {}
+        self._returned = {}
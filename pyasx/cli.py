@@ -0,0 +1,559 @@
+"""
+Command line interface for bulk exports of ASX data, installed as `pyasx`.
+
+    pyasx quotes CBA BHP                        # given tickers
+    pyasx quotes --format csv --output quotes.csv  # every listed security
+    cat tickers.txt | pyasx announcements -     # tickers from stdin
+    pyasx companies --workers 16 --output companies.ndjson --checkpoint companies.done
+    pyasx serve --port 8000 --ttl 30            # local mirror of the ASX endpoints
+
+Results are written as they arrive. With `--checkpoint` each completed ticker is
+recorded, so an interrupted run can be restarted with the same arguments and
+only the remaining tickers are fetched (the output is appended to).
+"""
+
+
+import argparse
+import concurrent.futures
+import datetime
+import json
+import os
+import sys
+import pyasx.cache
+import pyasx.client
+import pyasx.data
+import pyasx.data.companies
+import pyasx.data.securities
+
+
+def _get_quotes(ticker, client):
+
+    return [pyasx.data.securities.get_security_info(ticker, client)]
+
+
+def _get_companies(ticker, client):
+
+    return [pyasx.data.companies.get_company_info(ticker, client)]
+
+
+def _get_announcements(ticker, client):
+
+    announcements = pyasx.data.companies.get_company_announcements(ticker, client)
+
+    return [dict(announcement, ticker=ticker) for announcement in announcements]
+
+
+def _get_dividends(ticker, client):
+
+    company_info = pyasx.data.companies.get_company_info(ticker, client, sections=('last_dividend',))
+
+    return [dict(company_info['last_dividend'], ticker=ticker)]
+
+
+def _listed_companies(client):
+
+    return [company['ticker'] for company in pyasx.data.companies.get_listed_companies(client)]
+
+
+def _listed_securities(client):
+
+    return [security['ticker'] for security in pyasx.data.securities.get_listed_securities(client)]
+
+
+# per ticker commands; name -> (description, function to fetch the rows for a ticker,
+# function to list the default universe of tickers)
+TICKER_COMMANDS = {
+    'quotes': ("Security pricing info, see get_security_info()", _get_quotes, _listed_securities),
+    'companies': ("Company info, see get_company_info()", _get_companies, _listed_companies),
+    'announcements': ("Company announcements, see get_company_announcements()", _get_announcements, _listed_companies),
+    'dividends': ("Last company dividend, from get_company_info()", _get_dividends, _listed_companies),
+}
+
+
+def _json_default(value):
+
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+
+    raise TypeError("%r is not JSON serializable" % value)
+
+
+def _flatten(row, prefix=''):
+    """
+    Flatten nested dicts into a single dict with dotted keys, for tabular output.
+    Lists are encoded as JSON, dates as ISO 8601 strings.
+    """
+
+    flat = {}
+
+    for key, value in row.items():
+
+        key = prefix + key
+
+        if isinstance(value, dict):
+            flat.update(_flatten(value, key + '.'))
+        elif isinstance(value, list):
+            flat[key] = json.dumps(value, default=_json_default)
+        elif isinstance(value, (datetime.datetime, datetime.date)):
+            flat[key] = value.isoformat()
+        else:
+            flat[key] = value
+
+    return flat
+
+
+class NdjsonWriter(object):
+    """
+    Writes rows as newline delimited JSON.
+    """
+
+    def __init__(self, stream):
+
+        self.stream = stream
+
+    def write(self, rows):
+
+        for row in rows:
+            self.stream.write(json.dumps(row, default=_json_default))
+            self.stream.write("\n")
+
+        self.stream.flush()
+
+    def close(self):
+
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class CsvWriter(object):
+    """
+    Writes rows as CSV, nested values flattened into dotted column names. The
+    columns are taken from the first row written.
+    """
+
+    def __init__(self, stream, write_header=True):
+
+        self.stream = stream
+        self.write_header = write_header
+        self.writer = None
+
+    def write(self, rows):
+
+        import csv
+
+        for row in rows:
+
+            row = _flatten(row)
+
+            if self.writer is None:
+
+                self.writer = csv.DictWriter(self.stream, sorted(row), extrasaction='ignore')
+
+                if self.write_header:
+                    self.writer.writeheader()
+
+            self.writer.writerow(row)
+
+        self.stream.flush()
+
+    def close(self):
+
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class ParquetWriter(object):
+    """
+    Writes rows to a Parquet file, in row groups of `batch_size` rows. Nested
+    values are flattened into dotted column names, missing values ('') stored
+    as nulls & numbers as doubles. Requires `pyarrow`.
+
+    A Parquet file's schema can't change once it is started, so rows are
+    spilled to a temporary file as they arrive & the Parquet file is written on
+    `close()`, with a schema covering every column of every row. Columns with
+    only numbers are doubles, only bools are bools, everything else strings.
+    """
+
+    def __init__(self, path, batch_size=500):
+
+        import tempfile
+
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow; pip install pyarrow")
+
+        self.pyarrow = pyarrow
+        self.path = path
+        self.batch_size = batch_size
+        self.column_types = {}  # column -> 'double', 'bool', 'string' or None if only nulls
+        self.spill_stream = tempfile.TemporaryFile("w+")
+
+    def write(self, rows):
+
+        for row in rows:
+
+            row = _flatten(row)
+
+            for key, value in row.items():
+
+                if value == '':
+                    value = row[key] = None
+                elif isinstance(value, int) and not isinstance(value, bool):
+                    value = row[key] = float(value)
+
+                self._add_column_type(key, value)
+
+            self.spill_stream.write(json.dumps(row, default=_json_default))
+            self.spill_stream.write("\n")
+
+    def close(self):
+
+        import pyarrow.parquet
+
+        types = {
+            'double': self.pyarrow.float64(),
+            'bool': self.pyarrow.bool_(),
+            'string': self.pyarrow.string(),
+            None: self.pyarrow.string()
+        }
+
+        schema = self.pyarrow.schema([
+            (column, types[self.column_types[column]]) for column in sorted(self.column_types)
+        ])
+
+        string_columns = [
+            column for column in sorted(self.column_types) if self.column_types[column] == 'string'
+        ]
+
+        self.spill_stream.seek(0)
+
+        with pyarrow.parquet.ParquetWriter(self.path, schema) as writer:
+
+            batch = []
+
+            for line in self.spill_stream:
+
+                row = json.loads(line)
+
+                for column in string_columns:
+                    value = row.get(column)
+                    if value is not None and not isinstance(value, str):
+                        row[column] = str(value)
+
+                batch.append(row)
+
+                if len(batch) >= self.batch_size:
+                    writer.write_table(self.pyarrow.Table.from_pylist(batch, schema=schema))
+                    batch = []
+
+            if batch or not self.column_types:
+                writer.write_table(self.pyarrow.Table.from_pylist(batch, schema=schema))
+
+        self.spill_stream.close()
+
+    def _add_column_type(self, column, value):
+
+        if value is None:
+            value_type = None
+        elif isinstance(value, bool):
+            value_type = 'bool'
+        elif isinstance(value, float):
+            value_type = 'double'
+        else:
+            value_type = 'string'
+
+        column_type = self.column_types.get(column)
+
+        if column not in self.column_types or column_type is None:
+            self.column_types[column] = value_type
+        elif value_type is not None and value_type != column_type:
+            self.column_types[column] = 'string'
+
+
+def _open_writer(args, resuming):
+
+    if args.format == 'parquet':
+
+        if args.output in (None, '-'):
+            raise SystemExit("Parquet output requires --output")
+
+        if resuming:
+            raise SystemExit("Resuming with --checkpoint is not supported for parquet output")
+
+        return ParquetWriter(args.output)
+
+    if args.output in (None, '-'):
+        stream = sys.stdout
+        appending = False
+    else:
+        appending = resuming and os.path.exists(args.output) and os.path.getsize(args.output) > 0
+        stream = open(args.output, "a" if resuming else "w", newline='')
+
+    if args.format == 'csv':
+        return CsvWriter(stream, write_header=not appending)
+
+    return NdjsonWriter(stream)
+
+
+def _read_tickers(args, list_universe, client):
+
+    if not args.tickers:
+        return list_universe(client)
+
+    tickers = []
+
+    for ticker in args.tickers:
+
+        if ticker == '-':
+            tickers.extend(line.strip() for line in sys.stdin if line.strip())
+        else:
+            tickers.append(ticker)
+
+    return tickers
+
+
+def _read_checkpoint(path):
+
+    if path is None or not os.path.exists(path):
+        return set()
+
+    with open(path, "r") as checkpoint_stream:
+        return set(line.strip() for line in checkpoint_stream if line.strip())
+
+
+def run_ticker_command(args, fetch, list_universe, client):
+    """
+    Fetch the rows for each ticker concurrently, writing them as they arrive.
+    :return: The exit code, 1 if any lookups failed
+    """
+
+    completed = _read_checkpoint(args.checkpoint)
+
+    tickers = _read_tickers(args, list_universe, client)
+    tickers = [ticker.upper() for ticker in tickers]
+    tickers = [ticker for ticker in dict.fromkeys(tickers) if ticker not in completed]
+
+    writer = _open_writer(args, resuming=bool(completed))
+    checkpoint_stream = open(args.checkpoint, "a") if args.checkpoint else None
+
+    exit_code = 0
+
+    try:
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=client.max_workers) as executor:
+
+            futures = dict(
+                (executor.submit(fetch, ticker, client), ticker)
+                for ticker in tickers
+            )
+
+            try:
+
+                for future in concurrent.futures.as_completed(futures):
+
+                    ticker = futures[future]
+
+                    try:
+
+                        writer.write(future.result())
+
+                    except pyasx.data.UnknownTickerException as ex:
+                        # not worth retrying, so still checkpointed
+
+                        sys.stderr.write("%s\n" % str(ex))
+
+                    except pyasx.data.LookupError as ex:
+                        # not checkpointed, so retried when resumed
+
+                        sys.stderr.write("%s\n" % str(ex))
+                        exit_code = 1
+                        continue
+
+                    if checkpoint_stream is not None:
+                        checkpoint_stream.write("%s\n" % ticker)
+                        checkpoint_stream.flush()
+
+            except BaseException:
+                # aborting, e.g. on an unexpected error or Ctrl+C, so don't wait
+                # for the queued tickers only to discard them; those completed
+                # are already written & checkpointed
+
+                for future in futures:
+                    future.cancel()
+
+                raise
+
+    finally:
+
+        writer.close()
+
+        if checkpoint_stream is not None:
+            checkpoint_stream.close()
+
+    return exit_code
+
+
+def run_listed_command(args, list_rows, client):
+    """
+    Write the rows of one of the listed companies/securities lists.
+    :return: The exit code
+    """
+
+    writer = _open_writer(args, resuming=False)
+
+    try:
+        writer.write(list_rows(client))
+    finally:
+        writer.close()
+
+    return 0
+
+
+def run_serve_command(args, client):
+    """
+    Serve a mirror of the ASX endpoints until interrupted, see `pyasx.server`.
+    :return: The exit code
+    """
+
+    import pyasx.server  # imported lazily, only needed to serve
+
+    server = pyasx.server.MirrorServer(
+        (args.host, args.port),
+        client,
+        requests_per_second=args.requests_per_second,
+        verbose=args.verbose
+    )
+
+    sys.stderr.write("Mirroring ASX.com.au on http://%s:%s\n" % server.server_address[:2])
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return 0
+
+
+def _new_cache(args):
+    """
+    Create the cache of upstream responses for `pyasx serve`.
+    """
+
+    if args.hard_ttl is not None:
+        return pyasx.cache.StaleWhileRevalidateCache(
+            soft_ttl=args.ttl,
+            hard_ttl=args.hard_ttl,
+            max_size=args.max_entries
+        )
+
+    return pyasx.cache.TTLCache(ttl=args.ttl, max_size=args.max_entries)
+
+
+def _add_output_arguments(parser):
+
+    parser.add_argument("--format", choices=("ndjson", "csv", "parquet"), default="ndjson",
+                        help="output format (default: ndjson)")
+    parser.add_argument("--output", help="file to write to (default: stdout)")
+
+
+def build_parser():
+
+    parser = argparse.ArgumentParser(prog="pyasx", description="Bulk export of data from ASX.com.au")
+    parser.add_argument("--config", help="YAML file of configuration overrides, see pyasx.config")
+
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.required = True
+
+    for name in sorted(TICKER_COMMANDS):
+
+        description, fetch, list_universe = TICKER_COMMANDS[name]
+
+        subparser = subparsers.add_parser(name, help=description)
+        subparser.add_argument("tickers", nargs="*",
+                               help="tickers to fetch, - to read them from stdin (default: every listed ticker)")
+        subparser.add_argument("--workers", type=int, default=8, help="number of concurrent requests (default: 8)")
+        subparser.add_argument("--checkpoint", help="file recording completed tickers, to resume from")
+        _add_output_arguments(subparser)
+
+        if name == 'companies':
+            subparser.add_argument("--listed", action="store_true",
+                                   help="only export the list of listed companies, see get_listed_companies()")
+
+    subparser = subparsers.add_parser("securities", help="List of listed securities, see get_listed_securities()")
+    _add_output_arguments(subparser)
+
+    subparser = subparsers.add_parser("serve", help="Serve a local mirror of the ASX endpoints, see pyasx.server")
+    subparser.add_argument("--host", default="127.0.0.1", help="address to serve on (default: 127.0.0.1)")
+    subparser.add_argument("--port", type=int, default=8000, help="port to serve on (default: 8000)")
+    subparser.add_argument("--ttl", type=float, default=30,
+                           help="seconds upstream responses are cached for (default: 30)")
+    subparser.add_argument("--hard-ttl", type=float,
+                           help="serve responses up to this old while refreshing them in the background")
+    subparser.add_argument("--max-entries", type=int, default=10000,
+                           help="maximum number of cached upstream responses (default: 10000)")
+    subparser.add_argument("--requests-per-second", type=float, default=10,
+                           help="maximum rate of upstream requests (default: 10)")
+    subparser.add_argument("--workers", type=int, default=8, help="number of pooled upstream connections (default: 8)")
+    subparser.add_argument("--verbose", action="store_true", help="log each request to stderr")
+
+    return parser
+
+
+def _new_session(max_workers):
+    """
+    Create a session pooling enough connections for all of the workers.
+    """
+
+    import requests
+    import requests.adapters
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_workers)
+
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def main(argv=None):
+
+    args = build_parser().parse_args(argv)
+
+    max_workers = getattr(args, 'workers', 8)
+
+    client = pyasx.client.Client(
+        yaml_path=args.config,
+        session=_new_session(max_workers),
+        cache=_new_cache(args) if args.command == 'serve' else None,
+        max_workers=max_workers
+    )
+
+    try:
+
+        if args.command == 'serve':
+            return run_serve_command(args, client)
+
+        if args.command == 'securities':
+            return run_listed_command(args, pyasx.data.securities.get_listed_securities, client)
+
+        if args.command == 'companies' and args.listed:
+            return run_listed_command(args, pyasx.data.companies.get_listed_companies, client)
+
+        description, fetch, list_universe = TICKER_COMMANDS[args.command]
+
+        return run_ticker_command(args, fetch, list_universe, client)
+
+    except pyasx.data.LookupError as ex:
+
+        sys.stderr.write("%s\n" % str(ex))
+
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""
+Client carrying the configuration, HTTP session, cache & concurrency settings
+used to pull data from ASX.com.au.
+
+All of the `pyasx.data` functions take an optional `client`, falling back to
+the default client which is also what the `pyasx.config` functions act on. To
+use different settings within the same process create another `Client` and
+pass it explicitly, e.g.
+
+    mirror = pyasx.client.Client(yaml_path='/etc/pyasx/mirror.yml')
+    pyasx.data.securities.get_security_info('CBA', client=mirror)
+"""
+
+
+import logging
+import os
+import threading
+import pyasx.config
+
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent calls for the same key, so only one of them does the
+    work & the others wait for, then share, its result (or exception).
+    """
+
+
+    def __init__(self):
+
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> in flight _Call
+
+
+    def do(self, key, load):
+        """
+        Return the result of `load()`, or of the `load()` already in flight for
+        the same key.
+        """
+
+        with self._lock:
+
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+
+            call.result = load()
+
+        except BaseException as ex:
+
+            call.error = ex
+            raise
+
+        finally:
+
+            with self._lock:
+                del self._calls[key]
+
+            call.done.set()
+
+        return call.result
+
+
+class _Call(object):
+    """
+    A call in flight via `SingleFlight.do()`.
+    """
+
+    def __init__(self):
+
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Client(object):
+    """
+    Configuration & connection settings for pulling data from ASX.com.au.
+
+    Reading configuration is lock free, the values are held in a dict which is
+    never modified once published. Changes (`set()`, `load()` & reloads of the
+    YAML file) build a new dict and swap it in atomically.
+    """
+
+
+    def __init__(self, yaml_path=None, session=None, cache=None, max_workers=8, coalesce=True, memo=None):
+        """
+        :param yaml_path: YAML file of configuration overrides, defaults to the
+            `PYASX_CONFIG` environment variable if set
+        :param session: `requests.Session` to make requests with, e.g. to pool
+            connections. Defaults to a new connection per request.
+        :param cache: Cache for lookups, e.g. `pyasx.cache.TTLCache`
+        :param max_workers: Maximum number of concurrent requests for bulk lookups
+        :param coalesce: Whether concurrent lookups of the same endpoint share a
+            single request, see `lookup()`
+        :param memo: Memo of the last payload from each endpoint, so unchanged
+            payloads aren't normalised again, e.g. `pyasx.cache.PayloadMemo`
+        """
+
+        self.session = session
+        self.cache = cache
+        self.memo = memo
+        self.max_workers = max_workers
+        self.single_flight = SingleFlight() if coalesce else None
+
+        self._lock = threading.Lock()  # serialises config writers, not readers
+        self._overrides = {}  # values set via set(), survive reloads
+        self._yaml_path = None
+        self._yaml_mtime = None
+        self._config = {}
+        self._watcher = None
+
+        self.load(yaml_path)
+
+
+    @property
+    def http(self):
+        """
+        The object to make HTTP requests with, i.e. the session if one was
+        given, otherwise the `requests` module.
+        """
+
+        if self.session is not None:
+            return self.session
+
+        import requests  # imported lazily to keep importing pyasx fast
+
+        return requests
+
+
+    def get(self, key):
+        """
+        Returns the value of the given configuration item, None if not set.
+        """
+
+        return self._config.get(key)
+
+
+    def set(self, key, value):
+        """
+        Set the value of the given configuration item. This takes precedence
+        over the YAML file, including after it is reloaded.
+        """
+
+        with self._lock:
+
+            self._overrides[key] = value
+
+            config = dict(self._config)
+            config[key] = value
+
+            self._config = config
+
+
+    def load(self, yaml_path=None):
+        """
+        Load the configuration from scratch, i.e. `pyasx.config.DEFAULTS` plus
+        any overrides from the given YAML file. Values set via `set()` are
+        discarded.
+        :param yaml_path: YAML file of overrides, defaults to the `PYASX_CONFIG`
+            environment variable if set
+        """
+
+        if yaml_path is None:
+            yaml_path = os.environ.get('PYASX_CONFIG')
+
+        with self._lock:
+
+            self._yaml_path = yaml_path
+            self._overrides = {}
+            self._reload()
+
+
+    def reload(self):
+        """
+        Reload the YAML file the configuration was loaded from.
+        """
+
+        with self._lock:
+            self._reload()
+
+
+    def reload_if_changed(self):
+        """
+        Reload the YAML file if it has been modified since it was last loaded.
+        :return: True if it was reloaded
+        """
+
+        if not self._yaml_path or self._get_yaml_mtime() == self._yaml_mtime:
+            return False
+
+        self.reload()
+
+        return True
+
+
+    def watch(self, interval=5.0):
+        """
+        Start a background thread which hot reloads the YAML file whenever it
+        is modified, checking every `interval` seconds. If the modified file
+        can't be loaded, e.g. it is invalid YAML, the error is logged & the
+        current configuration kept until the file is next modified.
+        """
+
+        if self._watcher is not None:
+            return
+
+        stop = threading.Event()
+
+        def watch_loop():
+
+            failed_mtime = None  # so a broken file is only logged once
+
+            while not stop.wait(interval):
+
+                try:
+
+                    self.reload_if_changed()
+
+                except Exception:
+
+                    mtime = self._get_yaml_mtime()
+
+                    if mtime != failed_mtime:
+                        logger.exception("Failed to reload the pyasx config from %s", self._yaml_path)
+                        failed_mtime = mtime
+
+        thread = threading.Thread(target=watch_loop, name="pyasx-config-watcher")
+        thread.daemon = True
+        thread.start()
+
+        self._watcher = (thread, stop)
+
+
+    def stop_watching(self):
+        """
+        Stop the background thread started via `watch()`.
+        """
+
+        if self._watcher is not None:
+
+            thread, stop = self._watcher
+            self._watcher = None
+
+            stop.set()
+            thread.join()
+
+
+    def lookup(self, key, load):
+        """
+        Return the result of `load()`, via the cache if the client has one.
+
+        Unless the client was created with `coalesce=False`, concurrent lookups
+        with the same key (that miss the cache) are coalesced into a single
+        call to `load()`, with all of the callers sharing its result.
+        :param key: Uniquely identifies the lookup, i.e. the endpoint URL
+        """
+
+        if self.single_flight is not None:
+            uncoalesced_load = load
+            load = lambda: self.single_flight.do(key, uncoalesced_load)
+
+        if self.cache is None:
+            return load()
+
+        return self.cache.get_or_load(key, load)
+
+
+    def _get_yaml_mtime(self):
+
+        try:
+
+            return os.stat(self._yaml_path).st_mtime
+
+        except OSError:
+            # file removed, keep the current config
+
+            return self._yaml_mtime
+
+
+    def _reload(self):
+
+        config = dict(pyasx.config.DEFAULTS)
+        yaml_mtime = None
+
+        if self._yaml_path:
+            # taken before reading, so a write during the read is reloaded next
+            yaml_mtime = self._get_yaml_mtime()
+            config.update(pyasx.config._read_yaml(self._yaml_path))
+
+        config.update(self._overrides)
+
+        self._config = config
+
+        # only once loaded, so a file which fails to load is retried
+        self._yaml_mtime = yaml_mtime
+
+
+# the client used when none is given explicitly
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default():
+    """
+    Returns the default client, creating it on first use.
+    """
+
+    global _default_client
+
+    if _default_client is None:
+
+        with _default_client_lock:
+
+            if _default_client is None:
+                _default_client = Client()
+
+    return _default_client
+
+
+def set_default(client):
+    """
+    Replace the default client, e.g. to configure a cache or shared session for
+    every lookup which doesn't pass a client explicitly.
+    """
+
+    global _default_client
+
+    _default_client = client
@@ -1,67 +1,91 @@
 """
-Configuration manager for pyasx. Loads values from pyasx/config.yml.
+Configuration manager for pyasx. Values default to those in `DEFAULTS` below,
+and may be overridden by a YAML file given via the `PYASX_CONFIG` environment
+variable.
+
+The functions here act on the default `pyasx.client.Client`, create a separate
+client to use different configuration within the same process.
 """
 
 
-import os
-import yaml
-import pprint
+import pyasx.client
+
+
+# default pyasx configuration values
+DEFAULTS = {
+
+    # Endpoint providing CSV of listed companies and their tickers
+    'asx_companies_csv': 'https://www.asx.com.au/asx/research/ASXListedCompanies.csv',
+
+    # Endpoint providing XLS spreadsheet of all listed securities and their tickers
+    # NOTE the extension is xls but the file is actually tab separated
+    'asx_securities_tsv': 'https://www.asx.com.au/programs/ISIN.xls',
+
+    # Endpoint to pull individual companies data; %s = ticker
+    # NOTE get_company_info(sections=...) replaces the fields query
+    'asx_company_json': 'https://www.asx.com.au/asx/1/company/%s?fields=primary_share,last_dividend,primary_share.indices',
+
+    # Endpoint to pull individual securities data; %s = ticker
+    # OLD; http://data.asx.com.au/data/1/share/%s
+    'asx_single_json': 'https://www.asx.com.au/asx/1/share/%s',
+
+    # Endpoint to pull annoucements; %s = ticker
+    'asx_announcements_json': 'https://www.asx.com.au/asx/1/company/%s/announcements?count=20&market_sensitive=true',
+
+    # Endpoint for pulling historical ASX stock prices; %s = ticker
+    'floatau_historical_csv': 'http://float.com.au/download/%s.csv?format=stockeasy',
 
+    # Bytes read at a time when streaming the bulk (listed companies/securities) files
+    'bulk_chunk_size': 64 * 1024,
 
-# pyasx configuration values, loaded from file
-_config = {}
+    # Directory to keep gzip compressed copies of the bulk files in, which are
+    # revalidated with conditional requests; None to not keep copies
+    'bulk_cache_dir': None,
 
+}
 
-def load():
+
+def _read_yaml(yaml_path):
     """
-    Loads the pyasx configuration from the `pyasx/config.yml` file.
+    Read the configuration overrides from the given YAML file.
     """
 
-    global _config
+    import yaml  # imported lazily, only needed when overriding the defaults
 
-    # build the config yml file path
-    rel_path = os.path.dirname(__file__)
-    yaml_path = "%s/config.yml" % rel_path
+    # use the C loader where libyaml is available, it is much faster
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
-    # load config file
     with open(yaml_path, "r") as yaml_stream:
-
-        # try:
-        _config = yaml.load(yaml_stream)
-        # except yaml.YAMLError as ex:
-        #     print(ex)
+        return yaml.load(yaml_stream, Loader=loader) or {}
 
 
-def get(key):
+def load(yaml_path=None):
     """
-    Returns the value of the given configuration item.
-    :param key: The configuration item to get, e.g. pyasx.config.get('endpoints', 'asx_index_csv')
+    Loads the pyasx configuration of the default client, i.e. the `DEFAULTS`
+    plus any overrides from the given YAML file.
+    :param yaml_path: YAML file of overrides, defaults to the `PYASX_CONFIG`
+        environment variable if set
     """
 
-    global _config
-
-    value = None
+    pyasx.client.get_default().load(yaml_path)
 
-    # lazy load the config yaml
-    if len(_config) == 0:
-        load()
 
-    # get value from config dict
-    if key in _config:
-        value = _config[key]
+def get(key):
+    """
+    Returns the value of the given configuration item of the default client.
+    :param key: The configuration item to get, e.g. pyasx.config.get('asx_index_csv')
+    """
 
-    return value
+    return pyasx.client.get_default().get(key)
 
 
 def set(key, value):
     """
-    Set the value of the given confguration item. Handy to set ASX endpoints
-    dynamically if the API endpoints are changed but pyasx hasn't been updated
-    to reflect that.
+    Set the value of the given confguration item of the default client. Handy
+    to set ASX endpoints dynamically if the API endpoints are changed but pyasx
+    hasn't been updated to reflect that.
     :param key: The config item to set
     :param value: The value to set the config item to
     """
 
-    global _config
-
-    _config[key] = value;
+    pyasx.client.get_default().set(key, value)
@@ -1,8 +1,5 @@
 
 
-import dateutil.parser
-
-
 class UnknownTickerException(Exception):
     """
     Exception thrown when a lookup failed because the ticker doesn't match a
@@ -27,6 +24,8 @@ def _parse_datetime(datetime_string):
     :return: Parsed datetime object if valid, None if invalid date
     """
 
+    import dateutil.parser  # imported lazily, it is slow to import
+
     datetime_parsed = None
 
     try:
@@ -53,3 +52,198 @@ def _format_date(datetime_obj):
         datetime_string = datetime_obj.strftime('%Y-%m-%dT%H:%M:%S%z')
 
     return datetime_string
+
+
+def _fetch_json(endpoint, normalise, client, description, unknown_ticker_message=None):
+    """
+    GET the JSON at the given endpoint & normalise it, via the client's cache
+    if it has one. See `_fetch_json_payload()`.
+    """
+
+    return _fetch_json_payload(endpoint, normalise, client, description, unknown_ticker_message)[0]
+
+
+def _fetch_json_payload(endpoint, normalise, client, description, unknown_ticker_message=None):
+    """
+    GET the JSON at the given endpoint & normalise it, via the client's cache
+    if it has one. If the client has a memo, a payload identical to the last
+    one from the endpoint isn't normalised again.
+    :param normalise: Function to normalise the decoded JSON
+    :param client: The `pyasx.client.Client` to make the request with
+    :param description: What is being looked up, for the LookupError message
+    :param unknown_ticker_message: Message of the UnknownTickerException raised
+        if the endpoint 404s, if None a 404 is treated like any other error
+    :return: Tuple of the normalised result & whether it is unchanged since the
+        last lookup of the endpoint, always False without a memo
+    :raises pyasx.data.LookupError:
+    """
+
+    def load():
+
+        import requests  # imported lazily to keep importing pyasx fast
+
+        try:
+
+            response = client.http.get(endpoint)
+
+            if response.status_code != 200:  # 200 OK
+
+                if response.status_code == 404 and unknown_ticker_message is not None:
+                    # 404 not found, therefore unknown ticker
+
+                    raise UnknownTickerException(unknown_ticker_message)
+
+                # otherwise its an error, raise as status so we get a decent
+                # description to return in the exception
+                response.raise_for_status()
+
+        except requests.exceptions.RequestException as ex:
+
+            raise LookupError("Failed to lookup %s; %s" % (description, str(ex)))
+
+        # e.g. a HTML maintenance page, raised as a LookupError so it's
+        # handled (& retried) like any other failed lookup
+        message = "Failed to lookup %s; invalid JSON returned" % description
+
+        if client.memo is None:
+
+            try:
+                payload = response.json()
+            except ValueError as ex:
+                raise LookupError("%s, %s" % (message, str(ex)))
+
+            return normalise(payload)
+
+        import json
+
+        def decode(body):
+
+            try:
+                return json.loads(body)
+            except ValueError as ex:
+                raise LookupError("%s, %s" % (message, str(ex)))
+
+        return client.memo.resolve(endpoint, response.content, lambda body: normalise(decode(body)))
+
+    result = client.lookup(endpoint, load)
+
+    # flagged outside of the cache, so a cached result is also unchanged
+    if client.memo is None:
+        return result, False
+
+    return result, client.memo.returned(endpoint, result)
+
+
+def _stream_lines(endpoint, client, description, encoding):
+    """
+    GET a bulk text file, yielding its lines as each chunk arrives. The file is
+    requested compressed & decompressed incrementally, so rows are parsed
+    while it is still downloading without a temporary copy.
+
+    If the `bulk_cache_dir` config is set a gzip compressed copy of the file is
+    kept there, and reused when a conditional request finds it unchanged.
+    :param encoding: The encoding of the file
+    :raises pyasx.data.LookupError:
+    """
+
+    import codecs
+    import gzip
+    import json
+    import os
+    import requests  # imported lazily to keep importing pyasx fast
+    import urllib.parse
+
+    chunk_size = client.get('bulk_chunk_size') or 64 * 1024
+    cache_dir = client.get('bulk_cache_dir')
+
+    headers = { 'Accept-Encoding': 'gzip, deflate' }
+    conditional = False
+
+    if cache_dir:
+
+        name = os.path.basename(urllib.parse.urlsplit(endpoint).path) or 'index'
+        cache_path = os.path.join(cache_dir, "%s.gz" % name)
+        meta_path = "%s.json" % cache_path
+
+        if os.path.exists(cache_path) and os.path.exists(meta_path):
+
+            with open(meta_path, "r") as meta_stream:
+                meta = json.load(meta_stream)
+
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+            conditional = 'If-None-Match' in headers or 'If-Modified-Since' in headers
+
+    try:
+
+        response = client.http.get(endpoint, headers=headers, stream=True)
+
+        not_modified = conditional and response.status_code == 304
+        if not not_modified:
+            response.raise_for_status()  # throw exception for bad status codes
+
+    except requests.exceptions.HTTPError as ex:
+
+        raise LookupError("Failed to lookup %s; %s" % (description, str(ex)))
+
+    if not_modified:
+        # 304 not modified, so use the cached copy
+
+        with gzip.open(cache_path, "rt", encoding=encoding, newline='') as cached_stream:
+            for line in cached_stream:
+                yield line
+
+        return
+
+    cache_stream = None
+
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_stream = gzip.open("%s.tmp" % cache_path, "wb", compresslevel=6)
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+
+    try:
+
+        # chunks are decompressed by requests as they arrive
+        for block in response.iter_content(chunk_size):
+
+            if cache_stream is not None:
+                cache_stream.write(block)
+
+            lines = (pending + decoder.decode(block)).splitlines(True)
+
+            # hold back the last line until it is complete, including a \r
+            # which may be the first half of a \r\n
+            pending = lines.pop() if lines and not lines[-1].endswith('\n') else ''
+
+            for line in lines:
+                yield line
+
+        pending += decoder.decode(b'', True)
+
+        if pending:
+            yield pending
+
+        if cache_stream is not None:
+
+            cache_stream.close()
+            cache_stream = None
+
+            with open("%s.tmp" % meta_path, "w") as meta_stream:
+                json.dump({
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }, meta_stream)
+
+            os.replace("%s.tmp" % cache_path, cache_path)
+            os.replace("%s.tmp" % meta_path, meta_path)
+
+    finally:
+
+        if cache_stream is not None:
+            cache_stream.close()
@@ -0,0 +1,302 @@
+"""
+Builds intraday OHLCV bars from successive polls of
+`pyasx.data.securities.get_security_info()`, as ASX offer no tick feed.
+
+Each bar's volume is derived from the change in the cumulative `day_volume`
+between polls, so bars are only as fine grained as the polling, intervals with
+no polls have no bar.
+
+Bars are returned as compact typed arrays, one per column, e.g.
+{
+    'ticker': 'CBA',
+    'time': array('q', [1521079200, 1521079260, ...]),  # start of the bar, epoch seconds
+    'open': array('d', [79.2, 79.3, ...]),
+    'high': array('d', [79.4, 79.3, ...]),
+    'low': array('d', [79.1, 79.2, ...]),
+    'close': array('d', [79.3, 79.2, ...]),
+    'volume': array('q', [12034, 8540, ...])
+}
+"""
+
+
+import array
+import time
+
+
+# the bar columns, and the array type code each is stored as
+COLUMNS = (
+    ('time', 'q'),
+    ('open', 'd'),
+    ('high', 'd'),
+    ('low', 'd'),
+    ('close', 'd'),
+    ('volume', 'q')
+)
+
+# bar intervals built by default, in seconds
+INTERVALS = (60, 300)
+
+# length of a trading day, including the pre-open & closing auction, which
+# sets the default number of bars kept per ticker
+TRADING_DAY_SECONDS = int(6.5 * 60 * 60)
+
+
+def _import_numpy():
+
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Exporting bars to numpy requires numpy; pip install numpy")
+
+    return numpy
+
+
+def _to_number(value, convert):
+    """
+    Convert a price or volume field to a number, None if it is missing.
+    """
+
+    if isinstance(value, str):
+        value = value.strip().replace(',', '')
+
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BarRing(object):
+    """
+    Fixed size ring buffer of bars, held as an array per column. Once full,
+    each new bar overwrites the oldest. The last bar is the one being built.
+    """
+
+
+    def __init__(self, capacity):
+
+        self.capacity = capacity
+        self.columns = dict(
+            (column, array.array(type_code, [0]) * capacity) for column, type_code in COLUMNS
+        )
+
+        self._start = 0
+        self._count = 0
+
+
+    def __len__(self):
+
+        return self._count
+
+
+    def last_time(self):
+        """
+        :return: The start time of the last bar, None if there are no bars
+        """
+
+        if self._count == 0:
+            return None
+
+        return self.columns['time'][self._last_index()]
+
+
+    def append(self, bar_time, price, volume):
+        """
+        Start a new bar, overwriting the oldest if the ring is full.
+        """
+
+        if self._count < self.capacity:
+            index = (self._start + self._count) % self.capacity
+            self._count += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        columns = self.columns
+
+        columns['time'][index] = bar_time
+        columns['open'][index] = price
+        columns['high'][index] = price
+        columns['low'][index] = price
+        columns['close'][index] = price
+        columns['volume'][index] = volume
+
+
+    def update(self, price, volume):
+        """
+        Fold a quote into the last bar.
+        """
+
+        index = self._last_index()
+        columns = self.columns
+
+        if price > columns['high'][index]:
+            columns['high'][index] = price
+        if price < columns['low'][index]:
+            columns['low'][index] = price
+
+        columns['close'][index] = price
+        columns['volume'][index] += volume
+
+
+    def to_arrays(self):
+        """
+        :return: Copies of the column arrays, oldest bar first
+        """
+
+        end = self._start + self._count
+
+        if end <= self.capacity:
+            return dict(
+                (column, values[self._start:end]) for column, values in self.columns.items()
+            )
+
+        wrapped = end - self.capacity
+
+        return dict(
+            (column, values[self._start:] + values[:wrapped]) for column, values in self.columns.items()
+        )
+
+
+    def _last_index(self):
+
+        return (self._start + self._count - 1) % self.capacity
+
+
+class BarBuilder(object):
+    """
+    Aggregates polled quotes into OHLCV bars of one or more intervals, per
+    ticker. Memory is bounded, each ticker keeps a fixed number of bars of each
+    interval in a `BarRing`, by default a trading day's worth.
+    """
+
+
+    def __init__(self, intervals=INTERVALS, capacity=None, clock=time.time):
+        """
+        :param intervals: Bar intervals to build, in seconds
+        :param capacity: Number of bars of each interval kept per ticker,
+            defaults to a trading day's worth
+        :param clock: Function returning the current time in epoch seconds,
+            used to time quotes added without a timestamp
+        """
+
+        self.intervals = tuple(intervals)
+        self.capacity = capacity
+        self.clock = clock
+
+        self._rings = {}  # ticker -> { interval -> BarRing }
+        self._day_volumes = {}  # ticker -> day_volume of the last quote
+
+
+    def add(self, quote, timestamp=None):
+        """
+        Fold a polled quote into the bars of its ticker.
+        :param quote: As returned by `get_security_info()`, or by
+            `get_company_info()` in which case the primary share is used
+        :param timestamp: Time the quote was polled in epoch seconds, defaults
+            to now. Quotes older than the current bar are folded into it.
+        :return: False if the quote was skipped as it has no last price
+        """
+
+        quote = quote.get('primary_share', quote)
+
+        price = _to_number(quote.get('last_price'), float)
+        if price is None:
+            return False
+
+        ticker = quote['ticker'].upper()
+        timestamp = self.clock() if timestamp is None else timestamp
+
+        # volume traded since the last poll, the first poll of a ticker only
+        # sets the baseline, a drop means the day rolled over
+        day_volume = _to_number(quote.get('day_volume'), int)
+        volume = 0
+
+        if day_volume is not None:
+
+            last_day_volume = self._day_volumes.get(ticker)
+
+            if last_day_volume is not None:
+                volume = day_volume - last_day_volume if day_volume >= last_day_volume else day_volume
+
+            self._day_volumes[ticker] = day_volume
+
+        rings = self._rings.get(ticker)
+        if rings is None:
+            rings = self._rings[ticker] = dict(
+                (interval, BarRing(self.capacity or max(TRADING_DAY_SECONDS // interval, 1)))
+                for interval in self.intervals
+            )
+
+        for interval, ring in rings.items():
+
+            bar_time = int(timestamp // interval) * interval
+            last_time = ring.last_time()
+
+            if last_time is None or bar_time > last_time:
+                ring.append(bar_time, price, volume)
+            else:
+                ring.update(price, volume)
+
+        return True
+
+
+    def tickers(self):
+        """
+        :return: The tickers which have bars
+        """
+
+        return list(self._rings)
+
+
+    def bars(self, ticker, interval=60):
+        """
+        Get the bars of a ticker, oldest first, see the module docs for the
+        format. The last bar is still being built.
+        :param interval: The bar interval in seconds, one of `intervals`
+        """
+
+        ticker = ticker.upper()
+
+        if interval not in self.intervals:
+            raise ValueError("Bars are not built for interval %s" % interval)
+
+        rings = self._rings.get(ticker)
+
+        if rings is None:
+            bars = dict((column, array.array(type_code)) for column, type_code in COLUMNS)
+        else:
+            bars = rings[interval].to_arrays()
+
+        bars['ticker'] = ticker
+
+        return bars
+
+
+    def to_numpy(self, ticker, interval=60):
+        """
+        Get the bars of a ticker as in `bars()`, but with each column as a numpy
+        array. Requires numpy.
+        """
+
+        numpy = _import_numpy()
+
+        bars = self.bars(ticker, interval)
+
+        for column, type_code in COLUMNS:
+            bars[column] = numpy.frombuffer(bars[column], dtype=numpy.dtype(type_code))
+
+        return bars
+
+
+    def reset(self, ticker=None):
+        """
+        Discard the bars of a ticker, or of every ticker, e.g. at the start of
+        each trading day.
+        """
+
+        if ticker is None:
+            self._rings.clear()
+            self._day_volumes.clear()
+        else:
+            self._rings.pop(ticker.upper(), None)
+            self._day_volumes.pop(ticker.upper(), None)
@@ -3,15 +3,20 @@ Functions to pull information on ASX listed companies via the ASX.com.au API.
 """
 
 
-import csv
-import requests
-import tempfile
-import pyasx.config
+import pyasx.client
 import pyasx.data
 import pyasx.data.securities
 
 
-def get_listed_companies():
+# optional sections of the company info, and the `fields=` of the ASX API each needs
+COMPANY_SECTIONS = {
+    'primary_share': ('primary_share',),
+    'indices': ('primary_share', 'primary_share.indices'),
+    'last_dividend': ('last_dividend',)
+}
+
+
+def get_listed_companies(client=None):
     """
     Pulls a list of all companies listed on the ASX.  This will not include
     anything other than companies, i.e. no EFT/ETPs, options, warrants etc.
@@ -24,46 +29,38 @@ def get_listed_companies():
             'gics_industry': 'Banks'
         }
     ]
+    :param client: The `pyasx.client.Client` to use, defaults to the default client
     :raises pyasx.data.LookupError:
     """
 
-    all_listed_companies = []
-
-    # GET CSV file of ASX codes, as a stream
-    try:
-
-        response = requests.get(pyasx.config.get('asx_companies_csv'), stream=True)
-        response.raise_for_status()  # throw exception for bad status codes
-
-    except requests.exceptions.HTTPError as ex:
-
-        raise pyasx.data.LookupError("Failed to lookup listed companies; %s" % str(ex))
+    import csv  # imported lazily to keep importing pyasx fast
 
-    # parse the CSV result, piping it to a temp file to make the process more memory efficient
-    with tempfile.NamedTemporaryFile("w+") as temp_stream:
+    client = client or pyasx.client.get_default()
 
-        # pipe the CSV data to a temp file
-        for block in response.iter_content(1024, True):
-            temp_stream.write(block)
+    all_listed_companies = []
 
-        # rewind the temp stream and convert it to an iterator for csv.reader below
-        temp_stream.seek(0)
-        temp_iter = iter(temp_stream.readline, '');
+    # GET CSV file of ASX codes, parsing the rows as they are streamed in
+    lines = pyasx.data._stream_lines(
+        client.get('asx_companies_csv'),
+        client,
+        "listed companies",
+        'iso-8859-1'
+    )
 
-        # skip the first 3 rows of the CSV as they are header rows
-        for i in range(0, 3):
-            next(temp_iter)
+    # skip the first 3 rows of the CSV as they are header rows
+    for i in range(0, 3):
+        next(lines)
 
-        # read the stream back in & parse out the company details from each row
-        for row in csv.reader(temp_iter):
+    # parse out the company details from each row
+    for row in csv.reader(lines):
 
-            name, ticker, gics = row
+        name, ticker, gics = row
 
-            all_listed_companies.append({
-                'name': name,
-                'ticker': ticker,
-                'gics_industry': gics
-            })
+        all_listed_companies.append({
+            'name': name,
+            'ticker': ticker,
+            'gics_industry': gics
+        })
 
     return all_listed_companies
 
@@ -86,15 +83,15 @@ def _normalise_share_dividend_info(raw):
     if 'last_dividend' in raw:
         raw_dividend = raw['last_dividend']
 
-        last_dividend['type'] = raw_dividend['type'] if 'type' in raw else ''
-        last_dividend['created_date'] = raw_dividend['created_date'] if 'created_date' in raw else ''
-        last_dividend['ex_date'] = raw_dividend['ex_date'] if 'ex_date' in raw else ''
-        last_dividend['payable_date'] = raw_dividend['payable_date'] if 'payable_date' in raw else ''
-        last_dividend['record_date'] = raw_dividend['record_date'] if 'record_date' in raw else ''
-        last_dividend['books_close_date'] = raw_dividend['books_close_date'] if 'books_close_date' in raw else ''
-        last_dividend['amount_aud'] = raw_dividend['amount'] if 'amount' in raw else ''
-        last_dividend['franked_percent'] = raw_dividend['raw_franked_percentage'] if 'raw_franked_percentage' in raw else ''
-        last_dividend['comments'] = raw_dividend['comments'] if 'comments' in raw else ''
+        last_dividend['type'] = raw_dividend['type'] if 'type' in raw_dividend else ''
+        last_dividend['created_date'] = raw_dividend['created_date'] if 'created_date' in raw_dividend else ''
+        last_dividend['ex_date'] = raw_dividend['ex_date'] if 'ex_date' in raw_dividend else ''
+        last_dividend['payable_date'] = raw_dividend['payable_date'] if 'payable_date' in raw_dividend else ''
+        last_dividend['record_date'] = raw_dividend['record_date'] if 'record_date' in raw_dividend else ''
+        last_dividend['books_close_date'] = raw_dividend['books_close_date'] if 'books_close_date' in raw_dividend else ''
+        last_dividend['amount_aud'] = raw_dividend['amount'] if 'amount' in raw_dividend else ''
+        last_dividend['franked_percent'] = raw_dividend['raw_franked_percentage'] if 'raw_franked_percentage' in raw_dividend else ''
+        last_dividend['comments'] = raw_dividend['comments'] if 'comments' in raw_dividend else ''
 
         # parse dates to datetime objects
         last_dividend['created_date'] = pyasx.data._parse_datetime(last_dividend['created_date'])
@@ -128,8 +125,6 @@ def _normalise_company_info(raw):
     company_info['foreign_exempt'] = raw['foreign_exempt'] if 'foreign_exempt' in raw else False
     company_info['products'] = raw['products'] if 'products' in raw else []
 
-    company_info['last_dividend'] = _normalise_share_dividend_info(raw)
-
     # parse dates to datetime objects
     company_info['listing_date'] = pyasx.data._parse_datetime(company_info['listing_date'])
     company_info['delisting_date'] = pyasx.data._parse_datetime(company_info['delisting_date'])
@@ -137,7 +132,56 @@ def _normalise_company_info(raw):
     return company_info
 
 
-def get_company_info(ticker):
+# normalise the company info & the requested sections (if included) as part of get_company_info()
+def _normalise_company_response(raw, sections=None):
+
+    sections = COMPANY_SECTIONS if sections is None else sections
+
+    company_info = _normalise_company_info(raw)
+
+    if 'last_dividend' in sections:
+        company_info['last_dividend'] = _normalise_share_dividend_info(raw)
+
+    # company share info is sometimes included, other times it is not and we
+    # have to pull it separately
+    if 'primary_share' in sections or 'indices' in sections:
+
+        company_info['primary_share'] = None
+        if 'primary_share' in raw:
+            company_info['primary_share'] = pyasx.data.securities._normalise_security_info(raw['primary_share'])
+
+            if 'indices' not in sections:
+                del company_info['primary_share']['indices']
+
+    return company_info
+
+
+def _project_endpoint(endpoint, sections):
+    """
+    Replace the `fields=` query of the company info endpoint with the fields of
+    the given sections.
+    """
+
+    from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+    fields = []
+    for section in sorted(sections):
+
+        if section not in COMPANY_SECTIONS:
+            raise ValueError("Unknown company info section %s" % section)
+
+        fields.extend(field for field in COMPANY_SECTIONS[section] if field not in fields)
+
+    url = urlsplit(endpoint)
+
+    query = [(key, value) for key, value in parse_qsl(url.query) if key != 'fields']
+    if fields:
+        query.append(('fields', ','.join(fields)))
+
+    return urlunsplit(url._replace(query=urlencode(query, safe=',')))
+
+
+def get_company_info(ticker, client=None, sections=None):
     """
     Pull information on the company with the given ticker symbol. This also
     includes all of the pricing information returned by
@@ -148,58 +192,60 @@ def get_company_info(ticker):
     `pyasx.data.securities.get_security_info()`
 
     :param ticker: The ticker symbol of the company to lookup.
+    :param client: The `pyasx.client.Client` to use, defaults to the default client
+    :param sections: The sections of `COMPANY_SECTIONS` to pull along with the
+        basic company info, e.g. `('last_dividend',)`, defaults to all. Only
+        these are requested & normalised, the rest are left out of the result.
     :raises pyasx.data.LookupError:
     """
 
-    assert(len(ticker) >= 3)
+    return _get_company_info(ticker, client, sections)[0]
 
-    # build the endpoint to pull company info
-    endpoint_pattern = pyasx.config.get('asx_company_json')
-    endpoint = endpoint_pattern % ticker.upper()
 
-    # GET the company info
-    response = requests.get(endpoint)
-    if response.status_code != 200:  # 200 OK
-
-        if response.status_code == 404:
-            # 404 not found, therefore unknown ticker
-
-            raise pyasx.data.UnknownTickerException(
-                "Unknown company ticker %s" % ticker
-            )
-
-        else:
-            # otherwise its an error, raise as status so we get a decent description
-            # to return in the exception
-
-            try:
+def poll_company_info(ticker, client=None, sections=None):
+    """
+    Pull the company info as per `get_company_info()`, flagging whether it is
+    unchanged since the last pull, to skip downstream processing. Requires a
+    client with a memo, e.g. `Client(memo=pyasx.cache.PayloadMemo())`, to
+    detect unchanged info.
+    :return: Tuple of the company info & whether it is unchanged
+    :raises pyasx.data.LookupError:
+    """
 
-                response.raise_for_status()
+    return _get_company_info(ticker, client, sections)
 
-            except HTTPError as ex:
 
-                raise pyasx.data.LookupError(
-                    "Failed to lookup company info for %s; HTTP status %s" % (
-                        ticker, str(ex)
-                    )
-                )
+def _get_company_info(ticker, client, sections):
 
-    # parse response & normalise
+    assert(len(ticker) >= 3)
 
-    raw_info = response.json()
+    client = client or pyasx.client.get_default()
 
-    company_info = _normalise_company_info(raw_info)
+    # build the endpoint to pull company info
+    endpoint_pattern = client.get('asx_company_json')
+    endpoint = endpoint_pattern % ticker.upper()
 
-    # get company share info, sometimes this is included, other times it is not and we have to pull it manually
+    if sections is not None:
+        sections = frozenset(sections)
+        endpoint = _project_endpoint(endpoint, sections)
 
-    if 'primary_share' in raw_info:
-        share_info = pyasx.data.securities._normalise_security_info(raw_info['primary_share'])
-    else:
-        share_info = pyasx.data.securities.get_security_info(ticker)
+    # GET the company info & normalise
+    company_info, unchanged = pyasx.data._fetch_json_payload(
+        endpoint,
+        lambda raw: _normalise_company_response(raw, sections),
+        client,
+        "company info for %s" % ticker,
+        "Unknown company ticker %s" % ticker
+    )
 
-    company_info['primary_share'] = share_info
+    # pull the company share info if it wasn't included, copying so the
+    # (possibly cached) result isn't modified
+    if 'primary_share' in company_info and company_info['primary_share'] is None:
+        company_info = dict(company_info)
+        company_info['primary_share'], share_unchanged = pyasx.data.securities._get_security_info(ticker, client)
+        unchanged = unchanged and share_unchanged
 
-    return company_info
+    return company_info, unchanged
 
 
 # normalise the annoucements data pulled via get_company_annoucements()
@@ -228,38 +274,45 @@ def _normalise_annoucements(raw_annoucements):
     return annoucements
 
 
-def get_company_announcements(ticker):
+def get_company_announcements(ticker, client=None):
     """
     Pull the latest company announcements for the company with the given ticker
     symbol. This will only work for companies, it won't work for other securities.
 
     _NOTE_ This currently only pulls the 20 latest _market sensitive_ announcements.
     :param ticker: The ticker symbol of the company to pull annoucements for.
+    :param client: The `pyasx.client.Client` to use, defaults to the default client
     :raises pyasx.data.LookupError:
     """
 
-    # build the endpoint to pull announcements info
-    endpoint_pattern = pyasx.config.get('asx_announcements_json')
-    endpoint = endpoint_pattern % ticker.upper()
+    return _get_company_announcements(ticker, client)[0]
 
-    # GET the company annoucements
-    try:
 
-        response = requests.get(endpoint)
-        response.raise_for_status()  # throw exception for bad status codes
+def poll_company_announcements(ticker, client=None):
+    """
+    Pull the latest company announcements as per `get_company_announcements()`,
+    flagging whether they are unchanged since the last pull, to skip downstream
+    processing. Requires a client with a memo, e.g.
+    `Client(memo=pyasx.cache.PayloadMemo())`, to detect unchanged announcements.
+    :return: Tuple of the announcements & whether they are unchanged
+    :raises pyasx.data.LookupError:
+    """
 
-    except requests.exceptions.HTTPError as ex:
+    return _get_company_announcements(ticker, client)
 
-        raise pyasx.data.LookupError(
-            "Failed to lookup announcements for %s; %s" % (
-                ticker, str(ex)
-            )
-        )
 
-    # parse response & normalise
+def _get_company_announcements(ticker, client):
 
-    raw_announcements = response.json()
+    client = client or pyasx.client.get_default()
 
-    announcements = _normalise_annoucements(raw_announcements)
+    # build the endpoint to pull announcements info
+    endpoint_pattern = client.get('asx_announcements_json')
+    endpoint = endpoint_pattern % ticker.upper()
 
-    return announcements
+    # GET the company annoucements & normalise
+    return pyasx.data._fetch_json_payload(
+        endpoint,
+        _normalise_annoucements,
+        client,
+        "announcements for %s" % ticker
+    )
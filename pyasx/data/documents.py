@@ -0,0 +1,212 @@
+"""
+Functions to download the announcement documents (PDFs) returned by
+`pyasx.data.companies.get_company_announcements()`.
+
+Documents are stored content addressed, i.e. at `<directory>/<sha256[:2]>/<sha256>.pdf`
+of their content, so identical documents are only stored once. A small
+reference file per URL (`<directory>/urls/<sha256 of url>`) records which
+document each URL was downloaded to.
+"""
+
+
+import concurrent.futures
+import hashlib
+import os
+import time
+import pyasx.client
+import pyasx.data
+
+
+# bytes read from each response at a time
+CHUNK_SIZE = 64 * 1024
+
+
+def _url_key(url):
+
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def _ref_path(directory, url):
+
+    return os.path.join(directory, "urls", _url_key(url))
+
+
+def _partial_path(directory, url):
+
+    return os.path.join(directory, "partial", "%s.part" % _url_key(url))
+
+
+def _document_path(directory, content_hash):
+
+    return os.path.join(directory, content_hash[:2], "%s.pdf" % content_hash)
+
+
+def get_document_path(directory, url):
+    """
+    Returns the path the document at the given URL was downloaded to, None if
+    it hasn't been downloaded.
+    """
+
+    ref_path = _ref_path(directory, url)
+
+    if not os.path.exists(ref_path):
+        return None
+
+    with open(ref_path, "r") as ref_stream:
+        path = _document_path(directory, ref_stream.read().strip())
+
+    return path if os.path.exists(path) else None
+
+
+def _download_document(directory, url, client):
+    """
+    Download a single document, resuming a previous partial download via a HTTP
+    range request if there is one.
+    :return: Tuple of (path, bytes transferred, whether resumed)
+    """
+
+    import requests  # imported lazily to keep importing pyasx fast
+
+    partial_path = _partial_path(directory, url)
+    hasher = hashlib.sha256()
+
+    # hash what was already downloaded, so the content hash covers everything
+    offset = 0
+    if os.path.exists(partial_path):
+
+        with open(partial_path, "rb") as partial_stream:
+            for block in iter(lambda: partial_stream.read(CHUNK_SIZE), b''):
+                hasher.update(block)
+                offset += len(block)
+
+    headers = { 'Range': 'bytes=%d-' % offset } if offset else {}
+    transferred = 0
+
+    try:
+
+        response = client.http.get(url, headers=headers, stream=True)
+
+        if response.status_code == 416 and offset:
+            # already have the whole document
+            pass
+
+        else:
+
+            response.raise_for_status()  # throw exception for bad status codes
+
+            if response.status_code != 206:
+                # server ignored the range, start again from scratch
+
+                offset = 0
+                hasher = hashlib.sha256()
+
+            with open(partial_path, "ab" if offset else "wb") as partial_stream:
+
+                for block in response.iter_content(CHUNK_SIZE):
+                    partial_stream.write(block)
+                    hasher.update(block)
+                    transferred += len(block)
+
+    except requests.exceptions.RequestException as ex:
+
+        raise pyasx.data.LookupError("Failed to download %s; %s" % (url, str(ex)))
+
+    # move the complete document to its content addressed path, an identical
+    # document already there is simply replaced
+    content_hash = hasher.hexdigest()
+    path = _document_path(directory, content_hash)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    os.replace(partial_path, path)
+
+    # record which document the URL was downloaded to
+    ref_path = _ref_path(directory, url)
+
+    with open("%s.tmp" % ref_path, "w") as ref_stream:
+        ref_stream.write(content_hash)
+
+    os.replace("%s.tmp" % ref_path, ref_path)
+
+    return path, transferred, offset > 0
+
+
+def download_announcements(announcements, directory, client=None):
+    """
+    Download the documents of the given announcements concurrently, skipping any
+    already downloaded. Interrupted downloads are resumed where they left off.
+    For connection pooling give a client with a `requests.Session`.
+
+    This returns a dict of download statistics in the following format;
+    {
+        'downloaded': 18,  # number of documents downloaded, including resumed
+        'resumed': 1,  # number of documents resumed from a partial download
+        'skipped': 2,  # number of documents already downloaded
+        'bytes': 104857600,  # bytes transferred
+        'seconds': 12.5,  # time taken
+        'paths': { 'http://www.asx.com.au/asxpdf/...pdf': '/path/to/ab/ab12...pdf', ... },
+        'failed': { 'http://www.asx.com.au/asxpdf/...pdf': LookupError(...), ... }
+    }
+    :param announcements: Announcements, as returned by `get_company_announcements()`
+    :param directory: Directory to store the documents in
+    :param client: The `pyasx.client.Client` to use, its `max_workers` sets
+        the number of concurrent downloads
+    """
+
+    client = client or pyasx.client.get_default()
+
+    started = time.time()
+
+    for subdirectory in ("urls", "partial"):
+        os.makedirs(os.path.join(directory, subdirectory), exist_ok=True)
+
+    stats = {
+        'downloaded': 0,
+        'resumed': 0,
+        'skipped': 0,
+        'bytes': 0,
+        'seconds': 0.0,
+        'paths': {},
+        'failed': {}
+    }
+
+    # de-duplicate the URLs, skipping those already downloaded
+    urls = []
+    for url in dict.fromkeys(announcement['url'] for announcement in announcements if announcement['url']):
+
+        path = get_document_path(directory, url)
+
+        if path is None:
+            urls.append(url)
+        else:
+            stats['skipped'] += 1
+            stats['paths'][url] = path
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=client.max_workers) as executor:
+
+        futures = dict(
+            (executor.submit(_download_document, directory, url, client), url)
+            for url in urls
+        )
+
+        for future in concurrent.futures.as_completed(futures):
+
+            url = futures[future]
+
+            try:
+
+                path, transferred, resumed = future.result()
+
+            except pyasx.data.LookupError as ex:
+
+                stats['failed'][url] = ex
+                continue
+
+            stats['downloaded'] += 1
+            stats['resumed'] += 1 if resumed else 0
+            stats['bytes'] += transferred
+            stats['paths'][url] = path
+
+    stats['seconds'] = time.time() - started
+
+    return stats
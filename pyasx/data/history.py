@@ -0,0 +1,283 @@
+"""
+Functions to pull historical (daily) ASX stock prices, via the float.com.au CSV
+download.
+
+Prices are returned as compact typed arrays, one per column, rather than a list
+of dicts, e.g.
+{
+    'ticker': 'CBA',
+    'date': array('l', [20180102, 20180103, ...]),  # YYYYMMDD
+    'open': array('d', [79.2, 79.6, ...]),
+    'high': array('d', [79.6, 80.1, ...]),
+    'low': array('d', [78.9, 79.3, ...]),
+    'close': array('d', [79.5, 80.0, ...]),
+    'volume': array('q', [1876203, 2061298, ...])
+}
+"""
+
+
+import array
+import concurrent.futures
+import os
+import struct
+import pyasx.client
+import pyasx.data
+
+
+# the price columns, and the array type code each is stored as
+COLUMNS = (
+    ('date', 'l'),
+    ('open', 'd'),
+    ('high', 'd'),
+    ('low', 'd'),
+    ('close', 'd'),
+    ('volume', 'q')
+)
+
+# fixed width record each day of prices is stored as in the local store
+_RECORD = struct.Struct('<qddddq')
+
+
+def _new_prices(ticker):
+
+    prices = { 'ticker': ticker }
+
+    for column, type_code in COLUMNS:
+        prices[column] = array.array(type_code)
+
+    return prices
+
+
+def _parse_date(date_string):
+    """
+    Parse a date from the CSV to a YYYYMMDD int.
+    :return: The date, None if it is not a valid date
+    """
+
+    digits = date_string.replace('-', '')
+
+    if len(digits) == 8 and digits.isdigit():
+        return int(digits)
+
+    date_parsed = pyasx.data._parse_datetime(date_string)
+
+    if date_parsed is None:
+        return None
+
+    return date_parsed.year * 10000 + date_parsed.month * 100 + date_parsed.day
+
+
+def _parse_historical_csv(ticker, lines, after_date=0):
+    """
+    Parse the rows of the historical prices CSV into typed arrays, oldest day
+    first. Rows are in the format `ticker,date,open,high,low,close,volume`, the
+    leading ticker column is optional & any header rows are skipped.
+    :param lines: Iterable of the CSV lines, as str or bytes
+    :param after_date: Only parse rows after this date (YYYYMMDD)
+    """
+
+    prices = _new_prices(ticker)
+
+    dates = prices['date']
+    opens = prices['open']
+    highs = prices['high']
+    lows = prices['low']
+    closes = prices['close']
+    volumes = prices['volume']
+
+    for line in lines:
+
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+
+        row = line.strip().split(',')
+        if len(row) == 7:
+            row = row[1:]  # drop the ticker column
+
+        if len(row) != 6:
+            continue
+
+        date = _parse_date(row[0])
+        if date is None or date <= after_date:
+            continue  # header row, or already have this day
+
+        try:
+
+            opens.append(float(row[1]))
+            highs.append(float(row[2]))
+            lows.append(float(row[3]))
+            closes.append(float(row[4]))
+            volumes.append(int(float(row[5])))
+            dates.append(date)
+
+        except ValueError:
+            # not a valid row, remove any of the values already appended
+
+            for column, type_code in COLUMNS:
+                del prices[column][len(dates):]
+
+    # the CSV may be in any order, e.g. newest first, while the store relies on
+    # the days being in date order, so sort them, dropping any repeated days
+    if any(dates[i] >= dates[i + 1] for i in range(0, len(dates) - 1)):
+
+        first_rows = {}  # date -> index of its first row
+        for i, date in enumerate(dates):
+            first_rows.setdefault(date, i)
+
+        order = sorted(first_rows.values(), key=dates.__getitem__)
+
+        for column, type_code in COLUMNS:
+            prices[column] = array.array(type_code, [prices[column][i] for i in order])
+
+    return prices
+
+
+def get_historical_prices(ticker, after_date=0, client=None):
+    """
+    Pull the historical daily prices for the security with the given ticker
+    symbol. The CSV is streamed & parsed straight into typed arrays.
+    :param ticker: The ticker symbol of the security to lookup.
+    :param after_date: Only return prices after this date (YYYYMMDD)
+    :param client: The `pyasx.client.Client` to use, defaults to the default client
+    :raises pyasx.data.LookupError:
+    """
+
+    import requests  # imported lazily to keep importing pyasx fast
+
+    client = client or pyasx.client.get_default()
+
+    # build the endpoint to pull the price history
+    endpoint_pattern = client.get('floatau_historical_csv')
+    endpoint = endpoint_pattern % ticker.upper()
+
+    # GET the price history CSV, as a stream
+    try:
+
+        response = client.http.get(endpoint, stream=True)
+
+        if response.status_code == 404:
+            # 404 not found, therefore unknown ticker
+
+            raise pyasx.data.UnknownTickerException(
+                "Unknown security ticker %s" % ticker
+            )
+
+        response.raise_for_status()  # throw exception for bad status codes
+
+        return _parse_historical_csv(ticker.upper(), response.iter_lines(), after_date)
+
+    except requests.exceptions.RequestException as ex:
+
+        raise pyasx.data.LookupError(
+            "Failed to lookup historical prices for %s; %s" % (ticker, str(ex))
+        )
+
+
+def _store_path(store_dir, ticker):
+
+    return os.path.join(store_dir, "%s.ohlcv" % ticker.upper())
+
+
+def load_historical_prices(store_dir, ticker):
+    """
+    Load the historical prices for the given ticker from the local store, as
+    maintained via `update_historical_prices()`.
+    :return: The prices, empty arrays if there are none stored
+    """
+
+    prices = _new_prices(ticker.upper())
+    path = _store_path(store_dir, ticker)
+
+    if os.path.exists(path):
+
+        with open(path, "rb") as store_stream:
+            data = store_stream.read()
+
+        # drop any partially written trailing record
+        data = data[:len(data) - len(data) % _RECORD.size]
+
+        columns = [prices[column] for column, type_code in COLUMNS]
+
+        for record in _RECORD.iter_unpack(data):
+            for column, value in zip(columns, record):
+                column.append(value)
+
+    return prices
+
+
+def _append_historical_prices(store_dir, ticker, client):
+
+    path = _store_path(store_dir, ticker)
+    last_date = 0
+
+    # find the last date already stored, from the last complete record
+    if os.path.exists(path):
+
+        size = os.path.getsize(path)
+
+        if size % _RECORD.size:
+            # partially written trailing record, drop it before appending
+            size -= size % _RECORD.size
+            os.truncate(path, size)
+
+        if size:
+            with open(path, "rb") as store_stream:
+                store_stream.seek(size - _RECORD.size)
+                last_date = _RECORD.unpack(store_stream.read(_RECORD.size))[0]
+
+    prices = get_historical_prices(ticker, last_date, client)
+
+    columns = [prices[column] for column, type_code in COLUMNS]
+
+    with open(path, "ab") as store_stream:
+        store_stream.write(b''.join(_RECORD.pack(*record) for record in zip(*columns)))
+
+    return len(prices['date'])
+
+
+def update_historical_prices(tickers, store_dir, client=None):
+    """
+    Pull the historical prices for many tickers concurrently, appending only the
+    days not yet stored to the local store in the given directory. Load the
+    stored prices back via `load_historical_prices()`.
+
+    This returns a dict in the following format;
+    {
+        'updated': { 'CBA': 5, ... },  # number of new days stored per ticker
+        'failed': { 'XYZ': UnknownTickerException(...), ... }
+    }
+    :param tickers: The ticker symbols to pull prices for
+    :param store_dir: Directory of the local store
+    :param client: The `pyasx.client.Client` to use, its `max_workers` sets
+        the number of concurrent downloads
+    """
+
+    client = client or pyasx.client.get_default()
+
+    if not os.path.exists(store_dir):
+        os.makedirs(store_dir)
+
+    updated = {}
+    failed = {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=client.max_workers) as executor:
+
+        futures = dict(
+            (executor.submit(_append_historical_prices, store_dir, ticker, client), ticker)
+            for ticker in set(ticker.upper() for ticker in tickers)
+        )
+
+        for future in concurrent.futures.as_completed(futures):
+
+            try:
+
+                updated[futures[future]] = future.result()
+
+            except (pyasx.data.LookupError, pyasx.data.UnknownTickerException) as ex:
+
+                failed[futures[future]] = ex
+
+    return {
+        'updated': updated,
+        'failed': failed
+    }
@@ -0,0 +1,213 @@
+"""
+Index constituent & index membership lookups, built from the index info
+included with `pyasx.data.securities.get_security_info()`.
+"""
+
+
+import concurrent.futures
+import json
+import os
+import time
+import pyasx.client
+import pyasx.data
+import pyasx.data.securities
+
+
+class IndexMembership(object):
+    """
+    Cached map of index code to constituent tickers, plus the reverse map of
+    ticker to the index codes it is a member of. Both constituent & membership
+    lookups are O(1) dict lookups returning frozensets.
+
+    The map is updated incrementally from security info, so it can be fed
+    straight from a bulk quote sweep (e.g. `pyasx.scheduler.SweepScheduler`)
+    rather than needing a market wide fetch for each index query.
+    """
+
+
+    def __init__(self):
+
+        self._constituents = {}  # index code -> frozenset of tickers
+        self._memberships = {}  # ticker -> frozenset of index codes
+        self._index_names = {}  # index code -> index name
+        self._updated = {}  # ticker -> time last updated
+
+
+    def constituents(self, index_code):
+        """
+        :return: The tickers in the given index, e.g. constituents('XJO')
+        """
+
+        return self._constituents.get(index_code.upper(), frozenset())
+
+
+    def memberships(self, ticker):
+        """
+        :return: The index codes the given ticker is a member of
+        """
+
+        return self._memberships.get(ticker.upper(), frozenset())
+
+
+    def index_name(self, index_code):
+        """
+        :return: The full name of the given index, '' if unknown
+        """
+
+        return self._index_names.get(index_code.upper(), '')
+
+
+    def index_codes(self):
+        """
+        :return: All of the index codes seen so far
+        """
+
+        return frozenset(self._constituents)
+
+
+    def update(self, security_info):
+        """
+        Update the membership of a single security from the result of
+        `get_security_info()`. The result of `get_company_info()` may also be
+        given, in which case the primary share is used.
+        """
+
+        security_info = security_info.get('primary_share', security_info)
+
+        ticker = security_info['ticker'].upper()
+        codes = frozenset(index['code'] for index in security_info['indices'])
+
+        for index in security_info['indices']:
+            self._index_names[index['code']] = index['name']
+
+        self._set_memberships(ticker, codes)
+
+
+    def discard(self, ticker):
+        """
+        Remove a ticker from all indices, e.g. once it has been delisted.
+        """
+
+        self._set_memberships(ticker.upper(), frozenset())
+        self._updated.pop(ticker.upper(), None)
+
+
+    def stale_tickers(self, max_age):
+        """
+        :return: Tickers which were last updated more than `max_age` seconds ago
+        """
+
+        cutoff = time.time() - max_age
+
+        return [
+            ticker for ticker, updated in self._updated.items()
+            if updated < cutoff
+        ]
+
+
+    def refresh(self, tickers, client=None):
+        """
+        Pull the security info for the given tickers concurrently and update
+        their memberships. Tickers which are no longer listed are discarded.
+        :param tickers: The tickers to refresh, e.g. `stale_tickers(86400)`
+        :param client: The `pyasx.client.Client` to use, its `max_workers` sets
+            the number of concurrent lookups
+        :raises pyasx.data.LookupError:
+        """
+
+        client = client or pyasx.client.get_default()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=client.max_workers) as executor:
+
+            futures = dict(
+                (executor.submit(pyasx.data.securities.get_security_info, ticker, client), ticker)
+                for ticker in tickers
+            )
+
+            for future in concurrent.futures.as_completed(futures):
+
+                try:
+
+                    self.update(future.result())
+
+                except pyasx.data.UnknownTickerException:
+
+                    self.discard(futures[future])
+
+
+    def build(self, client=None):
+        """
+        Build the membership map from scratch by pulling the security info for
+        every listed security.
+        :param client: The `pyasx.client.Client` to use
+        :raises pyasx.data.LookupError:
+        """
+
+        securities = pyasx.data.securities.get_listed_securities(client)
+
+        self.refresh([security['ticker'] for security in securities], client)
+
+
+    def save(self, path):
+        """
+        Persist the membership map to disk, to be restored via `load()`.
+        """
+
+        data = {
+            'index_names': self._index_names,
+            'memberships': dict(
+                (ticker, sorted(codes)) for ticker, codes in self._memberships.items()
+            ),
+            'updated': self._updated
+        }
+
+        temp_path = "%s.tmp" % path
+
+        with open(temp_path, "w") as cache_stream:
+            json.dump(data, cache_stream)
+
+        os.replace(temp_path, path)
+
+
+    @classmethod
+    def load(cls, path):
+        """
+        Restore a membership map previously stored via `save()`.
+        """
+
+        with open(path, "r") as cache_stream:
+            data = json.load(cache_stream)
+
+        membership = cls()
+        membership._index_names = data['index_names']
+
+        for ticker, codes in data['memberships'].items():
+            membership._set_memberships(ticker, frozenset(codes))
+
+        membership._updated = data['updated']
+
+        return membership
+
+
+    def _set_memberships(self, ticker, codes):
+
+        old_codes = self._memberships.get(ticker, frozenset())
+
+        for code in old_codes - codes:
+
+            constituents = self._constituents[code] - frozenset([ticker])
+
+            if constituents:
+                self._constituents[code] = constituents
+            else:
+                del self._constituents[code]
+
+        for code in codes - old_codes:
+            self._constituents[code] = self._constituents.get(code, frozenset()) | frozenset([ticker])
+
+        if codes:
+            self._memberships[ticker] = codes
+        else:
+            self._memberships.pop(ticker, None)
+
+        self._updated[ticker] = time.time()
@@ -0,0 +1,307 @@
+"""
+Vectorised market screener over a snapshot of the security info returned by
+`pyasx.data.securities.get_security_info()`, joined with the company info from
+`pyasx.data.companies`. Requires `numpy`.
+
+    screener = Screener(securities, companies)
+    screener.screen("pe < 15 and annual_dividend_yield > 5 and market_cap > 1e9 "
+                    "and gics_industry == 'Banks'", sort_by='market_cap', limit=10)
+"""
+
+
+import ast
+import functools
+import operator
+import sys
+
+
+# security info fields held as float columns, missing values are NaN
+NUMERIC_FIELDS = (
+    'open_price', 'last_price', 'bid_price', 'offer_price', 'day_high_price',
+    'day_low_price', 'day_change_price', 'day_change_percent', 'day_volume',
+    'prev_day_close_price', 'prev_day_change_percent', 'year_high_price',
+    'year_low_price', 'year_open_price', 'year_change_price',
+    'year_change_percent', 'average_daily_volume', 'pe', 'eps',
+    'annual_dividend_yield', 'securities_outstanding', 'market_cap'
+)
+
+# security & company info fields held as string columns, missing values are ''
+STRING_FIELDS = ('ticker', 'isin', 'type', 'name', 'gics_sector', 'gics_industry')
+
+# security info fields held as bool columns
+BOOL_FIELDS = ('is_suspended',)
+
+# literal nodes, and the attribute holding their value, before Python 3.8 literals
+# are parsed as Num/Str/NameConstant rather than Constant
+if sys.version_info < (3, 8):
+    _LITERALS = { ast.Num: 'n', ast.Str: 's', ast.NameConstant: 'value' }
+else:
+    _LITERALS = { ast.Constant: 'value' }
+
+_COMPARISONS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+
+def _import_numpy():
+
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("pyasx.data.screener requires numpy; pip install numpy")
+
+    return numpy
+
+
+def _to_float(value):
+    """
+    Convert a numeric field to a float, e.g. 5.91, '-2.751%' or '' (NaN).
+    """
+
+    if isinstance(value, str):
+        value = value.strip().rstrip('%').replace(',', '')
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_expression(expression):
+
+    return ast.parse(expression, mode='eval').body
+
+
+class Screener(object):
+    """
+    A snapshot of the market held as column arrays, one per field, to screen
+    with vectorised filter expressions & sort/top-N.
+
+    Filter expressions are Python expressions over the field names, e.g.
+    `"pe < 15 and market_cap > 1e9 and gics_sector in ['Financials', 'Energy']"`,
+    supporting comparisons, `in`/`not in` lists, `and`, `or`, `not` & +-*/.
+    """
+
+
+    def __init__(self, securities=(), companies=()):
+        """
+        :param securities: Results of `get_security_info()`, or of
+            `get_company_info()` in which case the primary share is used
+        :param companies: Results of `get_company_info()` or
+            `get_listed_companies()`, joined by ticker for the name & GICS fields
+        """
+
+        self.numpy = _import_numpy()
+
+        self.columns = {}
+        self._rows = {}  # ticker -> row index
+        self._companies = {}  # ticker -> company info
+
+        for field in NUMERIC_FIELDS:
+            self.columns[field] = self.numpy.empty(0, dtype=self.numpy.float64)
+        for field in STRING_FIELDS:
+            self.columns[field] = self.numpy.empty(0, dtype=object)
+        for field in BOOL_FIELDS:
+            self.columns[field] = self.numpy.empty(0, dtype=bool)
+
+        self.update(securities, companies)
+
+
+    def __len__(self):
+
+        return len(self._rows)
+
+
+    def update(self, securities=(), companies=()):
+        """
+        Update the snapshot after a poll. Securities already in the snapshot are
+        updated in place, new ones are appended.
+        :param securities: Results of `get_security_info()` / `get_company_info()`
+        :param companies: Results of `get_company_info()` / `get_listed_companies()`
+        """
+
+        numpy = self.numpy
+
+        for company in companies:
+            self._companies[company['ticker'].upper()] = company
+
+        new_rows = []
+
+        for security_info in securities:
+
+            company = None
+            if 'primary_share' in security_info:
+                company = security_info
+                security_info = security_info['primary_share']
+
+            ticker = security_info['ticker'].upper()
+            company = company or self._companies.get(ticker, {})
+
+            row = self._row(security_info, company)
+
+            if ticker in self._rows:
+
+                index = self._rows[ticker]
+                for field, value in row.items():
+                    self.columns[field][index] = value
+
+            else:
+
+                self._rows[ticker] = len(self._rows)
+                new_rows.append(row)
+
+        if new_rows:
+
+            for field, column in self.columns.items():
+                values = numpy.array([row[field] for row in new_rows], dtype=column.dtype)
+                self.columns[field] = numpy.concatenate([column, values])
+
+
+    def mask(self, where):
+        """
+        Evaluate a filter expression over the snapshot.
+        :return: Boolean array, True for each row matching
+        """
+
+        if not where:
+            return self.numpy.ones(len(self), dtype=bool)
+
+        result = self._evaluate(_parse_expression(where))
+
+        return self.numpy.asarray(result, dtype=bool) & self.numpy.ones(len(self), dtype=bool)
+
+
+    def screen(self, where=None, sort_by=None, descending=True, limit=None, fields=None):
+        """
+        Screen the snapshot, returning the matching rows.
+        :param where: Filter expression, e.g. "pe < 15 and market_cap > 1e9"
+        :param sort_by: Field to sort the results by, NaNs are always last
+        :param descending: Whether to sort descending
+        :param limit: Maximum number of results, i.e. top-N
+        :param fields: Fields to include in the results, defaults to all
+        :return: List of dicts, one per matching row
+        """
+
+        numpy = self.numpy
+
+        indices = numpy.flatnonzero(self.mask(where))
+
+        if sort_by is not None:
+
+            keys = self.columns[sort_by][indices]
+
+            if keys.dtype == object:
+                order = numpy.argsort(keys.astype(str), kind='stable')
+                if descending:
+                    order = order[::-1]
+            else:
+                # NaNs sort last either way
+                order = numpy.argsort(-keys if descending else keys, kind='stable')
+
+            indices = indices[order]
+
+        if limit is not None:
+            indices = indices[:limit]
+
+        fields = fields or list(self.columns)
+        values = [self.columns[field][indices].tolist() for field in fields]
+
+        return [dict(zip(fields, row)) for row in zip(*values)]
+
+
+    def _row(self, security_info, company):
+
+        row = {}
+
+        for field in NUMERIC_FIELDS:
+            row[field] = _to_float(security_info.get(field, ''))
+
+        for field in STRING_FIELDS:
+            row[field] = security_info.get(field) or company.get(field) or ''
+
+        row['ticker'] = row['ticker'].upper()
+
+        for field in BOOL_FIELDS:
+            row[field] = bool(security_info.get(field))
+
+        return row
+
+
+    def _evaluate(self, node):
+
+        numpy = self.numpy
+
+        if isinstance(node, ast.BoolOp):
+
+            values = [self._evaluate(value) for value in node.values]
+            combine = numpy.logical_and if isinstance(node.op, ast.And) else numpy.logical_or
+
+            return functools.reduce(combine, values)
+
+        if isinstance(node, ast.UnaryOp):
+
+            operand = self._evaluate(node.operand)
+
+            if isinstance(node.op, ast.Not):
+                return numpy.logical_not(operand)
+            if isinstance(node.op, ast.USub):
+                return -operand
+            if isinstance(node.op, ast.UAdd):
+                return operand
+
+        if isinstance(node, ast.BinOp):
+
+            binary_operators = {
+                ast.Add: operator.add,
+                ast.Sub: operator.sub,
+                ast.Mult: operator.mul,
+                ast.Div: operator.truediv,
+            }
+
+            if type(node.op) in binary_operators:
+                return binary_operators[type(node.op)](self._evaluate(node.left), self._evaluate(node.right))
+
+        if isinstance(node, ast.Compare):
+
+            result = None
+            left = self._evaluate(node.left)
+
+            for op, comparator in zip(node.ops, node.comparators):
+
+                right = self._evaluate(comparator)
+
+                if isinstance(op, (ast.In, ast.NotIn)):
+                    matched = numpy.isin(left, right)
+                    if isinstance(op, ast.NotIn):
+                        matched = numpy.logical_not(matched)
+                elif type(op) in _COMPARISONS:
+                    with numpy.errstate(invalid='ignore'):
+                        matched = _COMPARISONS[type(op)](left, right)
+                else:
+                    raise ValueError("Unsupported comparison in filter expression")
+
+                result = matched if result is None else numpy.logical_and(result, matched)
+                left = right
+
+            return result
+
+        if isinstance(node, ast.Name):
+
+            if node.id not in self.columns:
+                raise ValueError("Unknown field in filter expression: %s" % node.id)
+
+            return self.columns[node.id]
+
+        if type(node) in _LITERALS:
+            return getattr(node, _LITERALS[type(node)])
+
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return [self._evaluate(element) for element in node.elts]
+
+        raise ValueError("Unsupported filter expression: %s" % ast.dump(node))
@@ -0,0 +1,469 @@
+"""
+Local full text search over announcement titles, from the announcements
+returned by `pyasx.data.companies.get_company_announcements()`.
+"""
+
+
+import array
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+
+
+# separates the fields of each stored announcement
+_FIELD_SEPARATOR = '\x1f'
+
+# matches quoted phrases & single terms in a query
+_QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenise(text):
+    """
+    Split text into the lower case terms which are indexed.
+    """
+
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _date_int(date):
+
+    if date is None or date == '':
+        return 0
+
+    return date.year * 10000 + date.month * 100 + date.day
+
+
+def _key_digest(key):
+    """
+    :param key: The (ticker, title, url, date) of an announcement
+    :return: A 64 bit digest of the key, to look up whether it's indexed
+    """
+
+    data = ("%s%s%d" % (_FIELD_SEPARATOR.join(key[:3]), _FIELD_SEPARATOR, key[3])).encode('utf-8')
+
+    return struct.unpack('<q', hashlib.md5(data).digest()[:8])[0]
+
+
+def _digest_index(keys):
+    """
+    :param keys: The key of each doc, in doc id order
+    :return: Tuple of arrays of the key digests, sorted, & the doc id of each
+    """
+
+    digests = sorted((_key_digest(key), doc_id) for doc_id, key in enumerate(keys))
+
+    return array.array('q', (digest for digest, doc_id in digests)), array.array('i', (doc_id for digest, doc_id in digests))
+
+
+def _date_order(dates):
+    """
+    :return: The indexes of the dates, sorted by date (then index)
+    """
+
+    return sorted(range(0, len(dates)), key=dates.__getitem__)
+
+
+class _DateKeys(object):
+    """
+    Sequence of the dates of a segment's docs in date order, to bisect a date
+    range without building a list of every date.
+    """
+
+    def __init__(self, segment):
+
+        self.segment = segment
+
+    def __len__(self):
+
+        return len(self.segment.by_date)
+
+    def __getitem__(self, index):
+
+        return self.segment.dates[self.segment.by_date[index]]
+
+
+class _Segment(object):
+    """
+    Read only, memory mapped, part of the index as written by `save()`.
+    """
+
+    def __init__(self, directory):
+
+        with open(os.path.join(directory, "meta.json"), "r") as meta_stream:
+            meta = json.load(meta_stream)
+
+        self.num_docs = meta['num_docs']
+        self.terms = meta['terms']  # term -> [offset, count] in postings
+
+        self._mmaps = []
+
+        self.postings = self._map(directory, "postings.bin", 'i')
+        self.dates = self._map(directory, "dates.bin", 'i')
+        self.offsets = self._map(directory, "offsets.bin", 'q')
+        self.strings = self._map(directory, "strings.bin", 'B')
+
+        # doc ids in date order, for term-less date range queries. Indexes
+        # saved before it was added have none, so it's built on load.
+        if os.path.exists(os.path.join(directory, "by_date.bin")):
+            self.by_date = self._map(directory, "by_date.bin", 'i')
+        else:
+            self.by_date = array.array('i', _date_order(self.dates))
+
+        # digests of every doc's key, sorted, & the doc id of each, to find
+        # whether an announcement is already indexed without decoding every
+        # doc. Built when first needed for indexes saved before they were added.
+        if os.path.exists(os.path.join(directory, "digests.bin")):
+            self.digests = self._map(directory, "digests.bin", 'q')
+            self.digest_docs = self._map(directory, "digest_docs.bin", 'i')
+        else:
+            self.digests = None
+            self.digest_docs = None
+
+    def _map(self, directory, name, type_code):
+
+        with open(os.path.join(directory, name), "rb") as map_stream:
+
+            if os.fstat(map_stream.fileno()).st_size == 0:
+                return memoryview(array.array(type_code))
+
+            mapped = mmap.mmap(map_stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._mmaps.append(mapped)
+
+        return memoryview(mapped).cast(type_code)
+
+    def postings_for(self, term):
+
+        if term not in self.terms:
+            return ()
+
+        offset, count = self.terms[term]
+
+        return self.postings[offset:offset + count]
+
+    def date_range(self, start_date, end_date):
+        """
+        :return: The ids of the docs dated in the given range, either end may
+            be None for an open range
+        """
+
+        keys = _DateKeys(self)
+
+        start = bisect.bisect_left(keys, start_date) if start_date is not None else 0
+        end = bisect.bisect_right(keys, end_date) if end_date is not None else len(keys)
+
+        return self.by_date[start:end]
+
+    def contains(self, key):
+        """
+        :param key: The (ticker, title, url, date) of an announcement
+        :return: True if the announcement is in the segment
+        """
+
+        if self.digests is None:
+            self.digests, self.digest_docs = _digest_index(
+                fields + [date] for fields, date in (self.doc(doc_id) for doc_id in range(0, self.num_docs))
+            )
+
+        digest = _key_digest(key)
+        index = bisect.bisect_left(self.digests, digest)
+
+        # digests may collide, so the matching docs are compared in full
+        while index < len(self.digests) and self.digests[index] == digest:
+
+            fields, date = self.doc(self.digest_docs[index])
+
+            if tuple(fields) + (date,) == tuple(key):
+                return True
+
+            index += 1
+
+        return False
+
+    def doc(self, doc_id):
+
+        data = bytes(self.strings[self.offsets[doc_id]:self.offsets[doc_id + 1]])
+
+        return data.decode('utf-8').split(_FIELD_SEPARATOR), self.dates[doc_id]
+
+
+class AnnouncementIndex(object):
+    """
+    Inverted index of announcement title terms to postings (announcement ids),
+    supporting term, phrase & date range queries. Doc ids are also kept in
+    date order, so a date range query without any terms is a binary search,
+    and by a digest of each announcement, so `add()` finds those already
+    indexed without reading in the whole index.
+
+    The index is updated incrementally via `add()` and persisted via `save()`.
+    `load()` memory maps a saved index, so even an index of millions of
+    announcements is searchable immediately without being read into memory.
+    """
+
+
+    def __init__(self):
+
+        self._segment = None  # saved part of the index, memory mapped
+
+        # part of the index added since it was loaded
+        self._terms = {}  # term -> array of doc ids
+        self._dates = array.array('i')  # YYYYMMDD
+        self._docs = []  # field separated ticker, title, url
+
+        self._keys = set()  # (ticker, title, url, date) of every added doc
+
+
+    def __len__(self):
+
+        return self._base_count() + len(self._docs)
+
+
+    def add(self, ticker, announcements):
+        """
+        Index the given announcements of a company, skipping any which are
+        already indexed. Dated by their release date.
+        :param ticker: The ticker of the company the announcements are for
+        :param announcements: As returned by `get_company_announcements()`
+        :return: The number of announcements added
+        """
+
+        ticker = ticker.upper()
+        added = 0
+
+        for announcement in announcements:
+
+            date = _date_int(announcement['release_date'] or announcement['document_date'])
+            key = (ticker, announcement['title'], announcement['url'], date)
+
+            if key in self._keys or (self._segment is not None and self._segment.contains(key)):
+                continue
+
+            self._keys.add(key)
+
+            doc_id = len(self)
+
+            self._docs.append(_FIELD_SEPARATOR.join(key[:3]))
+            self._dates.append(date)
+
+            for term in set(tokenise(announcement['title'])):
+                self._terms.setdefault(term, array.array('i')).append(doc_id)
+
+            added += 1
+
+        return added
+
+
+    def search(self, query, start_date=None, end_date=None, ticker=None, limit=None):
+        """
+        Find the announcements whose titles match the query. Every term in the
+        query must be present, and "quoted phrases" must appear in order, e.g.
+        `'"capital raising" placement'`. An empty query matches every
+        announcement in the date range, if one is given.
+
+        This returns an array, most recent first, in the following format;
+        [
+            {
+                'ticker': 'CBA',
+                'title': 'Capital Raising Update',
+                'url': 'http://www.asx.com.au/asxpdf/...pdf',
+                'date': 20180315  # YYYYMMDD
+            }
+        ]
+        :param start_date: Only match announcements on/after this date (YYYYMMDD)
+        :param end_date: Only match announcements on/before this date (YYYYMMDD)
+        :param ticker: Only match announcements for this ticker
+        :param limit: Maximum number of results
+        """
+
+        phrases = []
+        terms = []
+
+        for phrase, term in _QUERY_PATTERN.findall(query):
+
+            tokens = tokenise(phrase or term)
+            terms.extend(tokens)
+
+            if phrase and len(tokens) > 1:
+                phrases.append(tokens)
+
+        if terms:
+
+            # intersect the postings, starting with the rarest term
+            postings = sorted((self._postings(term) for term in set(terms)), key=len)
+            doc_ids = set(postings[0])
+
+            for term_postings in postings[1:]:
+                doc_ids.intersection_update(term_postings)
+
+        elif start_date is not None or end_date is not None:
+
+            doc_ids = self._date_range(start_date, end_date)
+
+        else:
+            return []
+
+        results = []
+
+        for doc_id in sorted(doc_ids, reverse=True):
+
+            fields, date = self._doc(doc_id)
+
+            if start_date is not None and date < start_date:
+                continue
+            if end_date is not None and date > end_date:
+                continue
+            if ticker is not None and fields[0] != ticker.upper():
+                continue
+
+            if phrases:
+                title_tokens = tokenise(fields[1])
+                if not all(self._contains_phrase(title_tokens, phrase) for phrase in phrases):
+                    continue
+
+            results.append({
+                'ticker': fields[0],
+                'title': fields[1],
+                'url': fields[2],
+                'date': date
+            })
+
+        results.sort(key=lambda result: result['date'], reverse=True)
+
+        return results[:limit] if limit is not None else results
+
+
+    def save(self, directory):
+        """
+        Persist the index to the given directory, to be memory mapped via `load()`.
+        """
+
+        os.makedirs(directory, exist_ok=True)
+
+        num_docs = len(self)
+
+        # merge the saved & added postings of each term
+        terms = {}
+        postings = array.array('i')
+
+        all_terms = set(self._terms)
+        if self._segment is not None:
+            all_terms.update(self._segment.terms)
+
+        for term in sorted(all_terms):
+
+            offset = len(postings)
+
+            postings.extend(self._postings(term))
+
+            terms[term] = [offset, len(postings) - offset]
+
+        dates = array.array('i')
+        offsets = array.array('q', [0])
+        strings = bytearray()
+        keys = []
+
+        for doc_id in range(0, num_docs):
+
+            fields, date = self._doc(doc_id)
+
+            strings.extend(_FIELD_SEPARATOR.join(fields).encode('utf-8'))
+            offsets.append(len(strings))
+            dates.append(date)
+            keys.append(fields + [date])
+
+        digests, digest_docs = _digest_index(keys)
+
+        # write to temp files, then swap them in
+        files = {
+            "postings.bin": postings.tobytes(),
+            "dates.bin": dates.tobytes(),
+            "offsets.bin": offsets.tobytes(),
+            "strings.bin": bytes(strings),
+            "by_date.bin": array.array('i', _date_order(dates)).tobytes(),
+            "digests.bin": digests.tobytes(),
+            "digest_docs.bin": digest_docs.tobytes(),
+            "meta.json": json.dumps({ 'num_docs': num_docs, 'terms': terms }).encode('utf-8')
+        }
+
+        for name, data in files.items():
+            with open(os.path.join(directory, "%s.tmp" % name), "wb") as index_stream:
+                index_stream.write(data)
+
+        # meta.json last, as it determines how much of the other files is read
+        for name in sorted(files, key=lambda name: name == "meta.json"):
+            os.replace(os.path.join(directory, "%s.tmp" % name), os.path.join(directory, name))
+
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Memory map an index previously stored via `save()`. Announcements may
+        still be added, they are held in memory until saved again.
+        """
+
+        index = cls()
+        index._segment = _Segment(directory)
+
+        return index
+
+
+    def _base_count(self):
+
+        return self._segment.num_docs if self._segment is not None else 0
+
+
+    def _postings(self, term):
+
+        base = self._segment.postings_for(term) if self._segment is not None else ()
+        added = self._terms.get(term, ())
+
+        if not added:
+            return base
+
+        if not base:
+            return added
+
+        return array.array('i', base) + added
+
+
+    def _date_range(self, start_date, end_date):
+
+        doc_ids = list(self._segment.date_range(start_date, end_date)) if self._segment is not None else []
+
+        # docs added since loading are few, so scanned
+        base_count = self._base_count()
+
+        doc_ids.extend(
+            base_count + doc_id for doc_id, date in enumerate(self._dates)
+            if (start_date is None or date >= start_date) and (end_date is None or date <= end_date)
+        )
+
+        return doc_ids
+
+
+    def _doc(self, doc_id):
+
+        base_count = self._base_count()
+
+        if doc_id < base_count:
+            return self._segment.doc(doc_id)
+
+        doc_id -= base_count
+
+        return self._docs[doc_id].split(_FIELD_SEPARATOR), self._dates[doc_id]
+
+
+    def _contains_phrase(self, tokens, phrase):
+
+        length = len(phrase)
+
+        return any(
+            tokens[i:i + length] == phrase
+            for i in range(0, len(tokens) - length + 1)
+        )
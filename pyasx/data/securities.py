@@ -3,16 +3,12 @@ Functions to pull information on ASX listed securities via the ASX.com.au API.
 """
 
 
-import csv
-import requests
-import requests.exceptions
-import tempfile
 import pyasx
-import pyasx.config
+import pyasx.client
 import pyasx.data
 
 
-def get_listed_securities():
+def get_listed_securities(client=None):
     """
     Pulls a list of all securities listed on the ASX.
 
@@ -25,47 +21,39 @@ def get_listed_securities():
             'isin': 'AU000000IJH2'
         }
     ]
+    :param client: The `pyasx.client.Client` to use, defaults to the default client
     :raises pyasx.data.LookupError:
     """
 
-    all_listed_securities = []
-
-    # GET CSV file of ASX codes, as a stream
-    try:
-
-        response = requests.get(pyasx.config.get('asx_securities_tsv'), stream=True)
-        response.raise_for_status()  # throw exception for bad status codes
-
-    except requests.exceptions.HTTPError as ex:
-
-        raise pyasx.data.LookupError("Failed to lookup listed securities; %s" % str(ex))
+    import csv  # imported lazily to keep importing pyasx fast
 
-    # parse the CSV result, piping it to a temp file to make the process more memory efficient
-    with tempfile.NamedTemporaryFile("w+") as temp_stream:
+    client = client or pyasx.client.get_default()
 
-        # pipe the CSV data to a temp file
-        for block in response.iter_content(1024, True):
-            temp_stream.write(block.decode('unicode_escape'))
+    all_listed_securities = []
 
-        # rewind the temp stream and convert it to an iterator for csv.reader below
-        temp_stream.seek(0)
-        temp_iter = iter(temp_stream.readline, '');
+    # GET TSV file of ASX codes, parsing the rows as they are streamed in
+    lines = pyasx.data._stream_lines(
+        client.get('asx_securities_tsv'),
+        client,
+        "listed securities",
+        'unicode_escape'
+    )
 
-        # skip the first 5 rows of the CSV as they are header rows
-        for i in range(0, 5):
-            next(temp_iter)
+    # skip the first 5 rows of the TSV as they are header rows
+    for i in range(0, 5):
+        next(lines)
 
-        # read the stream back in & parse out the company details from each row
-        for row in csv.reader(temp_iter, dialect="excel-tab"):
+    # parse out the security details from each row
+    for row in csv.reader(lines, dialect="excel-tab"):
 
-            ticker, name, type, isin = row
+        ticker, name, type, isin = row
 
-            all_listed_securities.append({
-                'ticker': ticker,
-                'name': name,
-                'type': type,
-                'isin': isin
-            })
+        all_listed_securities.append({
+            'ticker': ticker,
+            'name': name,
+            'type': type,
+            'isin': isin
+        })
 
     return all_listed_securities
 
@@ -140,52 +128,47 @@ def _normalise_security_info(raw):
     return security_info
 
 
-def get_security_info(ticker):
+def get_security_info(ticker, client=None):
     """
     Pull pricing information on the security with the given ticker symbol. This
     can be for any type of listed security, such as company stock, bonds, ETFs
     etc.
     :param ticker: The ticker symbol of the security to lookup.
+    :param client: The `pyasx.client.Client` to use, defaults to the default client
     :raises pyasx.data.LookupError:
     """
 
-    assert(len(ticker) >= 3)
-
-    # build the endpoint to pull security info
-    endpoint_pattern = pyasx.config.get('asx_single_json')
-    endpoint = endpoint_pattern % ticker.upper()
-
-    # GET the share info
-    response = requests.get(endpoint)
-    if response.status_code != 200:  # 200 OK
-
-        if response.status_code == 404:
-            # 404 not found, therefore unknown ticker
-
-            raise pyasx.data.UnknownTickerException(
-                "Unknown security ticker %s" % ticker
-            )
+    return _get_security_info(ticker, client)[0]
 
-        else:
-            # otherwise its an error, raise as status so we get a decent description
-            # to return in the exception
 
-            try:
+def poll_security_info(ticker, client=None):
+    """
+    Pull the security info as per `get_security_info()`, flagging whether it is
+    unchanged since the last pull, to skip downstream processing. Requires a
+    client with a memo, e.g. `Client(memo=pyasx.cache.PayloadMemo())`, to
+    detect unchanged info.
+    :return: Tuple of the security info & whether it is unchanged
+    :raises pyasx.data.LookupError:
+    """
 
-                response.raise_for_status()
+    return _get_security_info(ticker, client)
 
-            except HTTPError as ex:
 
-                raise pyasx.data.LookupError(
-                    "Failed to lookup company info for %s; HTTP status %s" % (
-                        ticker, str(ex)
-                    )
-                )
+def _get_security_info(ticker, client):
 
-    # parse response & normalise
+    assert(len(ticker) >= 3)
 
-    raw_info = response.json()
+    client = client or pyasx.client.get_default()
 
-    security_info = _normalise_security_info(raw_info)
+    # build the endpoint to pull security info
+    endpoint_pattern = client.get('asx_single_json')
+    endpoint = endpoint_pattern % ticker.upper()
 
-    return security_info
+    # GET the share info & normalise
+    return pyasx.data._fetch_json_payload(
+        endpoint,
+        _normalise_security_info,
+        client,
+        "security info for %s" % ticker,
+        "Unknown security ticker %s" % ticker
+    )
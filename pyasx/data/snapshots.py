@@ -0,0 +1,163 @@
+"""
+Functions to compute the changes between successive snapshots of the listed
+companies & securities pulled from ASX.com.au.
+"""
+
+
+import json
+import os
+import pyasx.data.companies
+import pyasx.data.securities
+
+
+def diff(old_rows, new_rows, key):
+    """
+    Compute the delta between two snapshots of rows, e.g. two results of
+    `get_listed_companies()`. Rows are matched up using the given key field so
+    this runs in linear time regardless of the ordering of either snapshot.
+
+    This returns a dict in the following format;
+    {
+        'added': [ { ... new row ... } ],
+        'removed': [ { ... old row ... } ],
+        'changed': [
+            {
+                'key': 'CBA',
+                'fields': [ 'gics_industry' ],
+                'old': { ... old row ... },
+                'new': { ... new row ... }
+            }
+        ]
+    }
+    :param old_rows: The previous snapshot
+    :param new_rows: The current snapshot
+    :param key: The field which uniquely identifies a row, e.g. 'ticker'
+    """
+
+    old_index = dict((row[key], row) for row in old_rows)
+    new_index = dict((row[key], row) for row in new_rows)
+
+    added = []
+    changed = []
+
+    for row_key, new_row in new_index.items():
+
+        old_row = old_index.get(row_key)
+
+        if old_row is None:
+            added.append(new_row)
+
+        elif old_row != new_row:
+
+            fields = sorted(
+                field for field in set(old_row) | set(new_row)
+                if old_row.get(field) != new_row.get(field)
+            )
+
+            changed.append({
+                'key': row_key,
+                'fields': fields,
+                'old': old_row,
+                'new': new_row
+            })
+
+    removed = [
+        old_row for row_key, old_row in old_index.items()
+        if row_key not in new_index
+    ]
+
+    return {
+        'added': added,
+        'removed': removed,
+        'changed': changed
+    }
+
+
+def diff_listed_companies(old_companies, new_companies):
+    """
+    Compute the delta between two results of `get_listed_companies()`, keyed by
+    ticker. See `diff()` for the format returned.
+    """
+
+    return diff(old_companies, new_companies, 'ticker')
+
+
+def diff_listed_securities(old_securities, new_securities):
+    """
+    Compute the delta between two results of `get_listed_securities()`, keyed
+    by ISIN. See `diff()` for the format returned.
+    """
+
+    return diff(old_securities, new_securities, 'isin')
+
+
+def load_snapshot(path):
+    """
+    Load a snapshot previously stored via `save_snapshot()`.
+    :return: The list of rows, or an empty list if there is no snapshot yet
+    """
+
+    if not os.path.exists(path):
+        return []
+
+    with open(path, "r") as snapshot_stream:
+        return json.load(snapshot_stream)
+
+
+def save_snapshot(path, rows):
+    """
+    Persist a snapshot to disk so it can be diffed against the next one. The
+    file is replaced atomically so a failed run never leaves a partial snapshot.
+    """
+
+    temp_path = "%s.tmp" % path
+
+    with open(temp_path, "w") as snapshot_stream:
+        json.dump(rows, snapshot_stream)
+
+    os.replace(temp_path, path)
+
+
+def _snapshot_delta(path, new_rows, diff_func):
+
+    old_rows = load_snapshot(path)
+
+    delta = diff_func(old_rows, new_rows)
+
+    save_snapshot(path, new_rows)
+
+    return delta
+
+
+def get_listed_companies_delta(path, client=None):
+    """
+    Pulls the list of listed companies and returns only what has changed since
+    the snapshot stored at the given path, then replaces that snapshot with the
+    current list. On the first run every company is returned as added.
+    :param path: File to persist the previous snapshot to
+    :param client: The `pyasx.client.Client` to use, defaults to the default client
+    :raises pyasx.data.LookupError:
+    """
+
+    return _snapshot_delta(
+        path,
+        pyasx.data.companies.get_listed_companies(client),
+        diff_listed_companies
+    )
+
+
+def get_listed_securities_delta(path, client=None):
+    """
+    Pulls the list of listed securities and returns only what has changed since
+    the snapshot stored at the given path, then replaces that snapshot with the
+    current list. On the first run every security is returned as added.
+    :param path: File to persist the previous snapshot to
+    :param client: The `pyasx.client.Client` to use, defaults to the default client
+    :raises pyasx.data.LookupError:
+    """
+
+    return _snapshot_delta(
+        path,
+        pyasx.data.securities.get_listed_securities(client),
+        diff_listed_securities
+    )
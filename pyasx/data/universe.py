@@ -0,0 +1,351 @@
+"""
+Shares the parsed listed companies & securities universe between processes.
+
+One process pulls & parses the universe once and publishes it, in a compact
+binary layout, to a memory mapped file (or `multiprocessing.shared_memory`).
+Other processes, e.g. web server workers, attach to it read only with zero
+copy access, so they need neither their own copy nor any warm up.
+
+    # in the master / a cron job
+    pyasx.data.universe.publish_universe('/dev/shm/pyasx-universe')
+
+    # in each worker
+    universe = pyasx.data.universe.Universe.attach('/dev/shm/pyasx-universe')
+    universe.companies.get('CBA')
+    {'ticker': 'CBA', 'name': 'COMMONWEALTH BANK OF AUSTRALIA.', 'gics_industry': 'Banks'}
+
+Layout: an 8 byte magic, a uint32 header length & a JSON header describing each
+table, followed by each table's int64 string offsets (one per field of each
+row, plus one) & UTF-8 string data. Rows are sorted by ticker.
+"""
+
+
+import array
+import bisect
+import json
+import mmap
+import os
+import struct
+import pyasx.data.companies
+import pyasx.data.securities
+
+
+_MAGIC = b'PYASXU1\0'
+
+_HEADER_LENGTH = struct.Struct('<I')
+
+# names of the shared memory blocks published by this process
+_published_blocks = set()
+
+# fields of each table, the ticker is always first as rows are sorted by it
+TABLE_FIELDS = {
+    'companies': ('ticker', 'name', 'gics_industry'),
+    'securities': ('ticker', 'name', 'type', 'isin')
+}
+
+
+def _align(size):
+
+    return (size + 7) & ~7
+
+
+def pack_universe(companies, securities):
+    """
+    Pack the listed companies & securities into the binary universe layout.
+    :param companies: As returned by `get_listed_companies()`
+    :param securities: As returned by `get_listed_securities()`
+    :return: The packed bytes
+    """
+
+    rows = { 'companies': companies, 'securities': securities }
+
+    header = { 'tables': {} }
+    sections = []
+    position = 0
+
+    for name in sorted(TABLE_FIELDS):
+
+        fields = TABLE_FIELDS[name]
+        table_rows = sorted(rows[name], key=lambda row: row['ticker'])
+
+        offsets = array.array('q', [0])
+        strings = bytearray()
+
+        for row in table_rows:
+            for field in fields:
+                strings.extend(row[field].encode('utf-8'))
+                offsets.append(len(strings))
+
+        offsets_bytes = offsets.tobytes()
+
+        header['tables'][name] = {
+            'fields': fields,
+            'rows': len(table_rows),
+            'offsets': position,
+            'strings': position + len(offsets_bytes),
+            'strings_length': len(strings)
+        }
+
+        sections.append(offsets_bytes)
+        sections.append(bytes(strings))
+        sections.append(b'\0' * (_align(len(strings)) - len(strings)))
+
+        position += len(offsets_bytes) + _align(len(strings))
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    prefix_length = _align(len(_MAGIC) + _HEADER_LENGTH.size + len(header_bytes))
+
+    prefix = _MAGIC + _HEADER_LENGTH.pack(len(header_bytes)) + header_bytes
+    prefix += b'\0' * (prefix_length - len(prefix))
+
+    return prefix + b''.join(sections)
+
+
+def publish_universe(path, companies=None, securities=None, client=None):
+    """
+    Publish the universe to a file for other processes to memory map via
+    `Universe.attach()`. The file is replaced atomically, so processes already
+    attached keep their (old) universe until they re-attach.
+    :param path: File to publish to, ideally on a tmpfs such as /dev/shm
+    :param companies: The listed companies, pulled via `get_listed_companies()` if not given
+    :param securities: The listed securities, pulled via `get_listed_securities()` if not given
+    :param client: The `pyasx.client.Client` to pull the universe with
+    :raises pyasx.data.LookupError:
+    """
+
+    if companies is None:
+        companies = pyasx.data.companies.get_listed_companies(client)
+
+    if securities is None:
+        securities = pyasx.data.securities.get_listed_securities(client)
+
+    temp_path = "%s.tmp" % path
+
+    with open(temp_path, "wb") as universe_stream:
+        universe_stream.write(pack_universe(companies, securities))
+
+    os.replace(temp_path, path)
+
+
+def publish_universe_shared_memory(name, companies=None, securities=None, client=None):
+    """
+    Publish the universe to a new `multiprocessing.shared_memory` block for
+    other processes to attach to via `Universe.attach_shared_memory()`.
+    :param name: The name of the shared memory block
+    :return: The `SharedMemory`, the publisher must keep it open & `unlink()` it
+        once no longer needed
+    :raises pyasx.data.LookupError:
+    """
+
+    from multiprocessing import shared_memory
+
+    if companies is None:
+        companies = pyasx.data.companies.get_listed_companies(client)
+
+    if securities is None:
+        securities = pyasx.data.securities.get_listed_securities(client)
+
+    data = pack_universe(companies, securities)
+
+    block = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+    block.buf[:len(data)] = data
+
+    _published_blocks.add(name)
+
+    return block
+
+
+class UniverseTable(object):
+    """
+    Read only view of one of the tables in a universe, rows are decoded to
+    dicts on access.
+    """
+
+
+    def __init__(self, buffer, base, layout):
+
+        self.fields = tuple(layout['fields'])
+
+        self._num_rows = layout['rows']
+        self._num_fields = len(self.fields)
+
+        offsets_start = base + layout['offsets']
+        offsets_end = offsets_start + (self._num_rows * self._num_fields + 1) * 8
+        self._offsets = buffer[offsets_start:offsets_end].cast('q')
+
+        strings_start = base + layout['strings']
+        self._strings = buffer[strings_start:strings_start + layout['strings_length']]
+
+
+    def __len__(self):
+
+        return self._num_rows
+
+
+    def __getitem__(self, index):
+
+        if index < 0:
+            index += self._num_rows
+
+        if not 0 <= index < self._num_rows:
+            raise IndexError("universe row index out of range")
+
+        return dict(zip(self.fields, (
+            self._field(index, field_index) for field_index in range(0, self._num_fields)
+        )))
+
+
+    def __iter__(self):
+
+        for index in range(0, self._num_rows):
+            yield self[index]
+
+
+    def get(self, ticker):
+        """
+        Binary search for the row with the given ticker.
+        :return: The row, None if there is no such ticker
+        """
+
+        ticker = ticker.upper()
+        index = bisect.bisect_left(_TickerKeys(self), ticker)
+
+        if index < self._num_rows and self._field(index, 0) == ticker:
+            return self[index]
+
+        return None
+
+
+    def tickers(self):
+        """
+        :return: All of the tickers in the table, sorted
+        """
+
+        return [self._field(index, 0) for index in range(0, self._num_rows)]
+
+
+    def _field(self, index, field_index):
+
+        position = index * self._num_fields + field_index
+
+        return str(self._strings[self._offsets[position]:self._offsets[position + 1]], 'utf-8')
+
+
+    def _release(self):
+
+        self._offsets.release()
+        self._strings.release()
+
+
+class _TickerKeys(object):
+    """
+    Sequence of the tickers of a table, to bisect without decoding every row.
+    """
+
+    def __init__(self, table):
+
+        self.table = table
+
+    def __len__(self):
+
+        return len(self.table)
+
+    def __getitem__(self, index):
+
+        return self.table._field(index, 0)
+
+
+class Universe(object):
+    """
+    Read only, zero copy, view of a published universe, with `companies` &
+    `securities` tables.
+    """
+
+
+    def __init__(self, buffer, closer=None):
+        """
+        :param buffer: Buffer holding the packed universe, see `pack_universe()`
+        :param closer: Function to release the underlying memory on `close()`
+        """
+
+        self._buffer = memoryview(buffer)
+        self._closer = closer
+
+        if bytes(self._buffer[:len(_MAGIC)]) != _MAGIC:
+            raise ValueError("Not a pyasx universe")
+
+        header_length = _HEADER_LENGTH.unpack_from(self._buffer, len(_MAGIC))[0]
+        header_start = len(_MAGIC) + _HEADER_LENGTH.size
+        header = json.loads(bytes(self._buffer[header_start:header_start + header_length]).decode('utf-8'))
+
+        base = _align(header_start + header_length)
+
+        self.companies = UniverseTable(self._buffer, base, header['tables']['companies'])
+        self.securities = UniverseTable(self._buffer, base, header['tables']['securities'])
+
+
+    def __enter__(self):
+
+        return self
+
+
+    def __exit__(self, *args):
+
+        self.close()
+
+
+    @classmethod
+    def attach(cls, path):
+        """
+        Memory map a universe published via `publish_universe()`.
+        """
+
+        with open(path, "rb") as universe_stream:
+            mapped = mmap.mmap(universe_stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return cls(mapped, mapped.close)
+
+
+    @classmethod
+    def attach_shared_memory(cls, name):
+        """
+        Attach to a universe published via `publish_universe_shared_memory()`.
+        The block is left for the publisher to unlink, attaching processes
+        exiting don't remove it.
+        """
+
+        from multiprocessing import shared_memory
+
+        try:
+
+            block = shared_memory.SharedMemory(name=name, track=False)
+
+        except TypeError:
+            # before Python 3.13 attaching registers the block with this
+            # process' resource tracker, which would unlink it on exit, from
+            # under the publisher & every other attached process
+
+            from multiprocessing import resource_tracker
+
+            block = shared_memory.SharedMemory(name=name)
+
+            # unless this process published it, in which case it's the
+            # publisher's registration
+            if name not in _published_blocks:
+                resource_tracker.unregister(block._name, 'shared_memory')
+
+        return cls(block.buf, block.close)
+
+
+    def close(self):
+        """
+        Release the underlying memory, the universe can't be used afterwards.
+        """
+
+        self.companies._release()
+        self.securities._release()
+        self._buffer.release()
+
+        if self._closer is not None:
+            self._closer()
+            self._closer = None
@@ -0,0 +1,236 @@
+"""
+Scheduler to sweep many tickers at different refresh rates, within a fixed
+request budget.
+"""
+
+
+import heapq
+import itertools
+import time
+import pyasx.data
+import pyasx.data.securities
+
+
+# target staleness (in seconds) for each of the priority tiers
+TIERS = {
+    'high': 30,
+    'medium': 5 * 60,
+    'low': 30 * 60
+}
+
+# securities in any of these indices are automatically put in the high tier
+HIGH_TIER_INDICES = ('XTL', 'XFL', 'XJO')
+
+# securities trading at least this average daily volume are put in the medium tier
+MEDIUM_TIER_VOLUME = 1000000
+
+
+def derive_tier(security_info):
+    """
+    Pick a priority tier for a security based on its index membership and
+    average daily volume, as returned by `get_security_info()`. Also accepts
+    the result of `get_company_info()`, in which case the primary share is used.
+    :return: The tier name, i.e. one of the keys of `TIERS`
+    """
+
+    security_info = security_info.get('primary_share', security_info)
+
+    for index in security_info.get('indices', []):
+        if index['code'] in HIGH_TIER_INDICES:
+            return 'high'
+
+    try:
+
+        if float(security_info.get('average_daily_volume') or 0) >= MEDIUM_TIER_VOLUME:
+            return 'medium'
+
+    except (TypeError, ValueError):
+        # volume missing or not numeric
+
+        pass
+
+    return 'low'
+
+
+class SweepScheduler(object):
+    """
+    Schedules lookups of a set of tickers, each with its own target staleness.
+    Tickers are kept in a priority queue keyed on the time they are next due,
+    and at most `requests_per_second` lookups are made each second.
+
+    Tickers added without a tier or staleness are tiered automatically via
+    `derive_tier()` each time they are looked up.
+    """
+
+
+    def __init__(self, fetch=None, requests_per_second=10, clock=time.time, sleep=time.sleep):
+        """
+        :param fetch: Function to do the lookup, defaults to
+            `pyasx.data.securities.get_security_info()`
+        :param requests_per_second: The request budget
+        :param clock: Function returning the current time, in seconds
+        :param sleep: Function to sleep for a number of seconds
+        """
+
+        self.fetch = fetch or pyasx.data.securities.get_security_info
+        self.requests_per_second = requests_per_second
+        self.clock = clock
+        self.sleep = sleep
+
+        self._queue = []  # heap of [due, seq, ticker]
+        self._entries = {}  # ticker -> heap entry
+        self._staleness = {}  # ticker -> staleness, None if auto tiered
+        self._seq = itertools.count()
+
+
+    def __len__(self):
+
+        return len(self._entries)
+
+
+    def __contains__(self, ticker):
+
+        return ticker.upper() in self._entries
+
+
+    def add(self, ticker, tier=None, staleness=None):
+        """
+        Add a ticker to the sweep, it will be due for lookup immediately.
+        :param ticker: The ticker symbol to sweep
+        :param tier: One of the `TIERS`, e.g. 'high'
+        :param staleness: Target staleness in seconds, overrides the tier
+        """
+
+        ticker = ticker.upper()
+
+        if staleness is None and tier is not None:
+            staleness = TIERS[tier]
+
+        self._staleness[ticker] = staleness
+        self._push(ticker, self.clock())
+
+
+    def add_securities(self, securities):
+        """
+        Add multiple securities to the sweep, tiered based on the security info
+        already pulled for them via `get_security_info()`.
+        """
+
+        for security_info in securities:
+            self.add(security_info['ticker'], tier=derive_tier(security_info))
+
+
+    def remove(self, ticker):
+        """
+        Remove a ticker from the sweep.
+        """
+
+        ticker = ticker.upper()
+
+        entry = self._entries.pop(ticker, None)
+        if entry is not None:
+            entry[-1] = None  # mark removed, is skipped when popped
+
+        self._staleness.pop(ticker, None)
+
+
+    def next_due(self):
+        """
+        :return: The time the next ticker is due, None if there are no tickers
+        """
+
+        self._discard_removed()
+
+        return self._queue[0][0] if self._queue else None
+
+
+    def run_pending(self):
+        """
+        Lookup the tickers which are currently due, up to the request budget.
+
+        This returns an array in the following format;
+        [
+            ( 'CBA', { ... result of fetch ... }, None ),
+            ( 'XYZ', None, UnknownTickerException(...) )
+        ]
+        Any exception raised by the lookup is returned as its error & the
+        ticker rescheduled, so one bad ticker or payload can't stop a sweep.
+        """
+
+        results = []
+        now = self.clock()
+
+        while len(results) < self.requests_per_second:
+
+            self._discard_removed()
+            if not self._queue or self._queue[0][0] > now:
+                break
+
+            due, seq, ticker = heapq.heappop(self._queue)
+            del self._entries[ticker]
+
+            result = None
+            error = None
+
+            try:
+
+                result = self.fetch(ticker)
+
+            except Exception as ex:
+
+                error = ex
+
+            staleness = self._staleness[ticker]
+            if staleness is None:
+                staleness = TIERS[derive_tier(result)] if result else TIERS['low']
+
+            self._push(ticker, self.clock() + staleness)
+
+            results.append((ticker, result, error))
+
+        return results
+
+
+    def run(self, callback, until=None):
+        """
+        Continuously sweep the tickers, calling `callback(ticker, result, error)`
+        for every lookup made.
+        :param until: Function returning True when the sweep should stop
+        """
+
+        while until is None or not until():
+
+            started = self.clock()
+
+            for ticker, result, error in self.run_pending():
+                callback(ticker, result, error)
+
+            # wait until either the next budget window or the next ticker is due
+
+            next_due = self.next_due()
+            wake = started + 1.0
+
+            if next_due is not None:
+                wake = max(wake, next_due)
+
+            delay = wake - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+
+
+    def _push(self, ticker, due):
+
+        old_entry = self._entries.get(ticker)
+        if old_entry is not None:
+            old_entry[-1] = None
+
+        entry = [due, next(self._seq), ticker]
+        self._entries[ticker] = entry
+
+        heapq.heappush(self._queue, entry)
+
+
+    def _discard_removed(self):
+
+        while self._queue and self._queue[0][-1] is None:
+            heapq.heappop(self._queue)
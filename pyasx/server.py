@@ -0,0 +1,231 @@
+"""
+Local mirror of the ASX.com.au endpoints, so many consumers can share one set
+of upstream requests. Run it via `pyasx serve`, then point the consumers'
+configuration at it, e.g.
+
+    pyasx.config.set('asx_single_json', 'http://localhost:8000/asx/1/share/%s')
+
+or set every endpoint at once via `mirror_endpoints()`.
+
+The mirror serves the same paths as the configured endpoints, returning the
+upstream responses as is. Upstream requests are made via a
+`pyasx.client.Client`, so are cached by its cache & concurrent requests for the
+same URL are coalesced, and are rate limited.
+"""
+
+
+import http.server
+import re
+import socketserver
+import threading
+import time
+import urllib.parse
+import pyasx.client
+import pyasx.config
+
+
+def _endpoint_keys():
+    """
+    :return: The configuration keys which are endpoints
+    """
+
+    return sorted(
+        key for key, value in pyasx.config.DEFAULTS.items()
+        if isinstance(value, str) and value.startswith('http')
+    )
+
+
+def mirror_endpoints(base_url, client=None):
+    """
+    Build the endpoint configuration to use a mirror.
+    :param base_url: Where the mirror is served, e.g. 'http://localhost:8000'
+    :param client: The `pyasx.client.Client` the mirror pulls from, defaults to
+        the default client
+    :return: Dict of configuration key to mirrored endpoint, e.g. to pass to
+        `pyasx.client.Client.set()` for each
+    """
+
+    client = client or pyasx.client.get_default()
+
+    endpoints = {}
+
+    for key in _endpoint_keys():
+
+        url = urllib.parse.urlsplit(client.get(key))
+        endpoints[key] = "%s%s%s" % (base_url.rstrip('/'), url.path, "?%s" % url.query if url.query else "")
+
+    return endpoints
+
+
+class RateLimiter(object):
+    """
+    Spaces calls to `acquire()` out to at most `requests_per_second`, blocking
+    callers as needed. Safe to share between threads.
+    """
+
+
+    def __init__(self, requests_per_second=10, clock=time.time, sleep=time.sleep):
+
+        self.interval = 1.0 / requests_per_second
+        self.clock = clock
+        self.sleep = sleep
+
+        self._lock = threading.Lock()
+        self._next = 0.0  # earliest time of the next request
+
+
+    def acquire(self):
+
+        with self._lock:
+
+            now = self.clock()
+            start = max(now, self._next)
+            self._next = start + self.interval
+
+        if start > now:
+            self.sleep(start - now)
+
+
+class UpstreamError(Exception):
+    """
+    Exception thrown when the upstream request failed, so is not cached.
+    """
+
+    pass
+
+
+class MirrorServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """
+    HTTP server mirroring the endpoints configured in a `pyasx.client.Client`.
+    Successful & 404 responses are cached by the client's cache, other upstream
+    errors are returned as a 502 & retried on the next request.
+    """
+
+    daemon_threads = True
+
+
+    def __init__(self, address=('127.0.0.1', 8000), client=None, requests_per_second=10, verbose=False):
+        """
+        :param address: The (host, port) to serve on
+        :param client: The `pyasx.client.Client` to pull from, give it a cache
+            (with a `max_size`) so repeat requests are served locally
+        :param requests_per_second: Maximum rate of upstream requests
+        :param verbose: Whether to log each request to stderr
+        """
+
+        self.client = client or pyasx.client.get_default()
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.verbose = verbose
+
+        # (path pattern, upstream scheme & host, query parameters) of each endpoint
+        self.routes = []
+
+        for key in _endpoint_keys():
+
+            url = urllib.parse.urlsplit(self.client.get(key))
+            pattern = re.escape(url.path).replace(re.escape('%s'), '[^/]+')
+            parameters = frozenset(name for name, value in urllib.parse.parse_qsl(url.query))
+
+            self.routes.append((re.compile(pattern), "%s://%s" % (url.scheme, url.netloc), parameters))
+
+        super(MirrorServer, self).__init__(address, _MirrorRequestHandler)
+
+
+    def upstream_url(self, path):
+        """
+        Map a requested path to the upstream URL. Only the query parameters of
+        the configured endpoint are passed on, sorted, so the URL (which is the
+        cache key) doesn't vary with parameters the endpoint doesn't take.
+        :param path: The path requested of the mirror, including any query
+        :return: The upstream URL to pull, None if the path isn't an endpoint
+        """
+
+        url = urllib.parse.urlsplit(path)
+
+        for pattern, upstream, parameters in self.routes:
+
+            if pattern.fullmatch(url.path):
+
+                query = sorted(
+                    (name, value) for name, value in urllib.parse.parse_qsl(url.query)
+                    if name in parameters
+                )
+
+                if not query:
+                    return upstream + url.path
+
+                return "%s%s?%s" % (upstream, url.path, urllib.parse.urlencode(query, safe=','))
+
+        return None
+
+
+    def fetch(self, url):
+        """
+        Pull the given upstream URL, via the client's cache.
+        :return: Tuple of the status code, content type & body
+        :raises UpstreamError:
+        """
+
+        def load():
+
+            import requests  # imported lazily to keep importing pyasx fast
+
+            self.rate_limiter.acquire()
+
+            try:
+
+                response = self.client.http.get(url)
+
+            except requests.exceptions.RequestException as ex:
+
+                raise UpstreamError(str(ex))
+
+            if response.status_code not in (200, 404):
+                raise UpstreamError("Upstream returned %s" % response.status_code)
+
+            content_type = response.headers.get('Content-Type', 'application/octet-stream')
+
+            return response.status_code, content_type, response.content
+
+        return self.client.lookup(url, load)
+
+
+class _MirrorRequestHandler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+
+    def do_GET(self):
+
+        url = self.server.upstream_url(self.path)
+
+        if url is None:
+            self.respond(404, "text/plain", b"Not a mirrored endpoint\n")
+            return
+
+        try:
+
+            status, content_type, body = self.server.fetch(url)
+
+        except UpstreamError as ex:
+
+            self.respond(502, "text/plain", ("%s\n" % ex).encode('utf-8'))
+            return
+
+        self.respond(status, content_type, body)
+
+
+    def respond(self, status, content_type, body):
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        self.wfile.write(body)
+
+
+    def log_message(self, format, *args):
+
+        if self.server.verbose:
+            super(_MirrorRequestHandler, self).log_message(format, *args)
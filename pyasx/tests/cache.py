@@ -0,0 +1,142 @@
+
+
+import threading
+import time
+import unittest
+import pyasx.cache
+import pyasx.data
+
+
+class CacheTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.cache module
+    """
+
+
+    def setUp(self):
+
+        self.now = 1000.0
+        self.loads = 0
+
+        self.cache = pyasx.cache.StaleWhileRevalidateCache(
+            soft_ttl=10,
+            hard_ttl=60,
+            max_refreshes=1,
+            clock=lambda: self.now
+        )
+
+
+    def load(self):
+
+        self.loads += 1
+
+        return self.loads
+
+
+    def waitForRefreshes(self):
+
+        for i in range(0, 100):
+
+            if not self.cache._refreshing:
+                return
+
+            time.sleep(0.01)
+
+        self.fail("background refresh did not complete")
+
+
+    def testStaleWhileRevalidate(self):
+        """
+        Unit test for pyasx.cache.StaleWhileRevalidateCache.get_or_load()
+        Test stale values are served while refreshed in the background
+        """
+
+        self.assertEqual(self.cache.get_or_load("CBA", self.load), 1)
+        self.assertEqual(self.cache.get_or_load("CBA", self.load), 1)
+
+        # past the soft TTL the stale value is served while refreshing
+        self.now += 10
+        self.assertEqual(self.cache.get_or_load("CBA", self.load), 1)
+        self.waitForRefreshes()
+        self.assertEqual(self.cache.get_or_load("CBA", self.load), 2)
+
+        # past the hard TTL callers block on the reload
+        self.now += 60
+        self.assertEqual(self.cache.get_or_load("CBA", self.load), 3)
+
+
+    def testMaxRefreshes(self):
+        """
+        Unit test for pyasx.cache.StaleWhileRevalidateCache.get_or_load()
+        Test the number of concurrent background refreshes is limited
+        """
+
+        release = threading.Event()
+
+        def slow_load():
+            release.wait()
+            return "fresh"
+
+        self.cache.get_or_load("CBA", lambda: "stale")
+        self.cache.get_or_load("BHP", lambda: "stale")
+
+        self.now += 10
+        self.assertEqual(self.cache.get_or_load("CBA", slow_load), "stale")
+        self.assertEqual(self.cache.get_or_load("BHP", slow_load), "stale")
+        self.assertEqual(self.cache._refreshing, set(["CBA"]))
+
+        release.set()
+        self.waitForRefreshes()
+
+        self.assertEqual(self.cache.get_or_load("CBA", slow_load), "fresh")
+        self.assertEqual(self.cache.get_or_load("BHP", slow_load), "stale")
+
+
+    def testRefreshError(self):
+        """
+        Unit test for pyasx.cache.StaleWhileRevalidateCache.get_or_load()
+        Test the stale value is kept if the background refresh fails
+        """
+
+        def failing_load():
+            raise pyasx.data.LookupError("upstream down")
+
+        self.cache.get_or_load("CBA", self.load)
+
+        self.now += 10
+        self.assertEqual(self.cache.get_or_load("CBA", failing_load), 1)
+        self.waitForRefreshes()
+        self.assertEqual(self.cache.get_or_load("CBA", failing_load), 1)
+        self.waitForRefreshes()
+
+        self.now += 60
+        self.assertRaises(pyasx.data.LookupError, self.cache.get_or_load, "CBA", failing_load)
+
+
+    def testMaxSize(self):
+        """
+        Unit test for pyasx.cache.TTLCache with a max_size
+        Test expired, then the oldest, entries are evicted once full
+        """
+
+        cache = pyasx.cache.TTLCache(ttl=10, clock=lambda: self.now, max_size=10)
+
+        for i in range(0, 5):
+            cache.get_or_load("OLD%s" % i, self.load)
+
+        self.now += 10
+
+        for i in range(0, 6):
+            self.now += 1
+            cache.get_or_load("NEW%s" % i, self.load)
+
+        # the expired entries are swept out
+        self.assertEqual(len(cache), 6)
+
+        for i in range(6, 11):
+            self.now += 1
+            cache.get_or_load("NEW%s" % i, self.load)
+
+        # NEW0 has expired, then the oldest are evicted to leave room
+        self.assertEqual(len(cache), 9)
+        self.assertEqual(sorted(cache._entries), sorted("NEW%s" % i for i in range(2, 11)))
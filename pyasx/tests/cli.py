@@ -0,0 +1,212 @@
+
+
+import datetime
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+import pyasx.cli
+import pyasx.data
+
+try:
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class CliTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.cli module
+    """
+
+
+    def setUp(self):
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.temp_dir.name, "quotes.out")
+        self.checkpoint = os.path.join(self.temp_dir.name, "quotes.done")
+
+        self.failing = set()
+        self.delay = 0
+
+
+    def tearDown(self):
+
+        self.temp_dir.cleanup()
+
+
+    def get_security_info(self, ticker, client):
+
+        if ticker == "XYZ":
+            raise pyasx.data.UnknownTickerException("Unknown security ticker XYZ")
+
+        if ticker in self.failing:
+            raise pyasx.data.LookupError("Failed to lookup security info for %s" % ticker)
+
+        if ticker == "ERR":
+            raise RuntimeError("Unexpected error for %s" % ticker)
+
+        time.sleep(self.delay)
+
+        return {
+            "ticker": ticker,
+            "last_price": 1.5,
+            "indices": [ { "code": "XJO", "name": "S&P/ASX 200" } ]
+        }
+
+
+    def runCli(self, *args):
+
+        with unittest.mock.patch("pyasx.data.securities.get_security_info") as mock:
+
+            mock.side_effect = self.get_security_info
+
+            with unittest.mock.patch("sys.stderr", io.StringIO()):
+                return pyasx.cli.main(list(args))
+
+
+    def readOutput(self):
+
+        with open(self.output, "r") as output_stream:
+            return output_stream.read()
+
+
+    def testQuotesNdjson(self):
+        """
+        Unit test for `pyasx quotes`
+        Test results are written as NDJSON
+        """
+
+        exit_code = self.runCli("quotes", "CBA", "bhp", "XYZ", "--output", self.output)
+        self.assertEqual(exit_code, 0)
+
+        rows = [json.loads(line) for line in self.readOutput().splitlines()]
+        self.assertEqual(sorted(row["ticker"] for row in rows), ["BHP", "CBA"])
+        self.assertEqual(rows[0]["indices"][0]["code"], "XJO")
+
+
+    def testQuotesStdinCsv(self):
+        """
+        Unit test for `pyasx quotes`
+        Test tickers are read from stdin & results written as CSV
+        """
+
+        with unittest.mock.patch("sys.stdin", io.StringIO("CBA\n\nBHP\n")):
+            self.runCli("quotes", "-", "--format", "csv", "--output", self.output)
+
+        lines = self.readOutput().splitlines()
+        self.assertEqual(lines[0], "indices,last_price,ticker")
+        self.assertEqual(len(lines), 3)
+
+
+    def testCheckpointResume(self):
+        """
+        Unit test for `pyasx quotes --checkpoint`
+        Test only the failed tickers are fetched when resumed
+        """
+
+        self.failing.add("BHP")
+
+        args = ("quotes", "CBA", "BHP", "XYZ", "--format", "csv", "--output", self.output, "--checkpoint", self.checkpoint)
+
+        self.assertEqual(self.runCli(*args), 1)
+        self.assertEqual(len(self.readOutput().splitlines()), 2)
+
+        self.failing.clear()
+
+        self.assertEqual(self.runCli(*args), 0)
+
+        lines = self.readOutput().splitlines()
+        self.assertEqual(len(lines), 3)  # only a single header row
+        self.assertTrue(lines[1].endswith(",CBA"))
+        self.assertTrue(lines[2].endswith(",BHP"))
+
+        with open(self.checkpoint, "r") as checkpoint_stream:
+            self.assertEqual(sorted(checkpoint_stream.read().split()), ["BHP", "CBA", "XYZ"])
+
+
+    def testAbort(self):
+        """
+        Unit test for `pyasx quotes --checkpoint`
+        Test an unexpected error aborts without fetching the queued tickers
+        """
+
+        self.delay = 0.05
+
+        tickers = ["CBA", "ERR"] + ["T%02d" % i for i in range(0, 20)]
+
+        with self.assertRaises(RuntimeError), \
+                unittest.mock.patch("pyasx.data.securities.get_security_info") as mock:
+
+            mock.side_effect = self.get_security_info
+
+            pyasx.cli.main(["quotes"] + tickers + ["--workers", "1", "--output", self.output, "--checkpoint", self.checkpoint])
+
+        self.assertLess(mock.call_count, len(tickers))
+
+        with open(self.checkpoint, "r") as checkpoint_stream:
+            self.assertEqual(checkpoint_stream.read().split()[0], "CBA")
+
+
+    def testDividends(self):
+        """
+        Unit test for `pyasx dividends`
+        Test the last dividend of each company is written
+        """
+
+        with unittest.mock.patch("requests.Session.get") as mock:
+
+            instance = mock.return_value
+            instance.status_code = 200
+            instance.json.return_value = {
+                "code": "CBA",
+                "last_dividend": {
+                    "type": "Final",
+                    "created_date": "2018-02-07T00:00:00+1100",
+                    "ex_date": "2018-02-14T00:00:00+1100",
+                    "payable_date": "2018-03-28T00:00:00+1100",
+                    "record_date": "2018-02-15T00:00:00+1100",
+                    "books_close_date": "2018-02-15T00:00:00+1100",
+                    "amount": 2,
+                    "raw_franked_percentage": 100,
+                    "comments": "COMMENTS"
+                }
+            }
+
+            self.assertEqual(self.runCli("dividends", "CBA", "--output", self.output), 0)
+
+        row = json.loads(self.readOutput())
+
+        self.assertEqual(row["ticker"], "CBA")
+        self.assertEqual(row["type"], "Final")
+        self.assertEqual(row["amount_aud"], 2)
+        self.assertEqual(row["franked_percent"], 100)
+        self.assertEqual(row["comments"], "COMMENTS")
+        self.assertEqual(row["ex_date"], "2018-02-14T00:00:00+11:00")
+        self.assertEqual(row["payable_date"], "2018-03-28T00:00:00+11:00")
+
+
+    @unittest.skipIf(pyarrow is None, "requires pyarrow")
+    def testParquetWriter(self):
+        """
+        Unit test for pyasx.cli.ParquetWriter
+        Test columns null in the first rows & columns only in later rows are kept
+        """
+
+        writer = pyasx.cli.ParquetWriter(self.output, batch_size=1)
+
+        writer.write([{ "ticker": "MOQ", "pe": "", "delisting_date": None, "is_suspended": False }])
+        writer.write([{ "ticker": "CBA", "pe": 12, "delisting_date": datetime.date(2018, 3, 15), "is_suspended": False }])
+        writer.write([{ "ticker": "BHP", "pe": 16.2, "primary_share": { "last_price": 30.5 } }])
+        writer.close()
+
+        table = pyarrow.parquet.read_table(self.output)
+
+        self.assertEqual(str(table.schema.field("pe").type), "double")
+        self.assertEqual(str(table.schema.field("is_suspended").type), "bool")
+        self.assertEqual(table.column("pe").to_pylist(), [None, 12.0, 16.2])
+        self.assertEqual(table.column("delisting_date").to_pylist(), [None, "2018-03-15", None])
+        self.assertEqual(table.column("primary_share.last_price").to_pylist(), [None, None, 30.5])
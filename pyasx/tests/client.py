@@ -0,0 +1,311 @@
+
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock
+import pyasx.cache
+import pyasx.client
+import pyasx.config
+import pyasx.data
+import pyasx.data.securities
+
+
+class ClientTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.client module
+    """
+
+
+    def setUp(self):
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.yaml_path = os.path.join(self.temp_dir.name, "config.yml")
+
+        self.writeYaml("http://mirror/share/%s")
+
+
+    def tearDown(self):
+
+        self.temp_dir.cleanup()
+
+
+    def writeYaml(self, endpoint):
+
+        with open(self.yaml_path, "w") as yaml_stream:
+            yaml_stream.write("asx_single_json: %s\n" % endpoint)
+
+
+    def testIndependentClients(self):
+        """
+        Test separate clients don't share configuration
+        """
+
+        mirror = pyasx.client.Client(yaml_path=self.yaml_path)
+        mirror.set("asx_company_json", "http://mirror/company/%s")
+
+        self.assertEqual(mirror.get("asx_single_json"), "http://mirror/share/%s")
+        self.assertEqual(mirror.get("asx_company_json"), "http://mirror/company/%s")
+
+        self.assertEqual(pyasx.config.get("asx_single_json"), pyasx.config.DEFAULTS["asx_single_json"])
+        self.assertEqual(pyasx.config.get("asx_company_json"), pyasx.config.DEFAULTS["asx_company_json"])
+
+        with unittest.mock.patch("requests.get") as mock:
+
+            mock.return_value.json.return_value = { "code": "CBA" }
+
+            pyasx.data.securities.get_security_info("CBA", client=mirror)
+            mock.assert_called_with("http://mirror/share/CBA")
+
+
+    def testReload(self):
+        """
+        Unit test for pyasx.client.Client.reload_if_changed()
+        Test values set explicitly survive reloads
+        """
+
+        client = pyasx.client.Client(yaml_path=self.yaml_path)
+        client.set("asx_company_json", "http://local/company/%s")
+
+        self.assertFalse(client.reload_if_changed())
+
+        self.writeYaml("http://other/share/%s")
+        os.utime(self.yaml_path, (0, 0))  # ensure the mtime differs
+
+        self.assertTrue(client.reload_if_changed())
+        self.assertEqual(client.get("asx_single_json"), "http://other/share/%s")
+        self.assertEqual(client.get("asx_company_json"), "http://local/company/%s")
+
+        # reads are never blocked by, or see a partial, reload
+        def read():
+            for i in range(0, 10000):
+                self.assertTrue(client.get("asx_single_json").endswith("/share/%s"))
+
+        readers = [threading.Thread(target=read) for i in range(0, 4)]
+        for reader in readers:
+            reader.start()
+
+        for i in range(0, 50):
+            client.reload()
+
+        for reader in readers:
+            reader.join()
+
+
+    def testReloadInvalid(self):
+        """
+        Unit test for pyasx.client.Client.watch()
+        Test invalid YAML is logged & the current config kept until fixed
+        """
+
+        client = pyasx.client.Client(yaml_path=self.yaml_path)
+
+        with open(self.yaml_path, "w") as yaml_stream:
+            yaml_stream.write("asx_single_json: [unclosed\n")
+        os.utime(self.yaml_path, (0, 0))
+
+        with self.assertRaises(Exception):
+            client.reload_if_changed()
+
+        self.assertEqual(client.get("asx_single_json"), "http://mirror/share/%s")
+
+        with self.assertLogs("pyasx.client", level="ERROR"):
+
+            client.watch(interval=0.01)
+
+            try:
+
+                time.sleep(0.1)  # the watcher fails to load it
+
+                self.writeYaml("http://other/share/%s")
+                os.utime(self.yaml_path, (1, 1))
+
+                for i in range(0, 200):
+                    if client.get("asx_single_json") == "http://other/share/%s":
+                        break
+                    time.sleep(0.01)
+
+            finally:
+                client.stop_watching()
+
+        self.assertEqual(client.get("asx_single_json"), "http://other/share/%s")
+
+
+    def testCache(self):
+        """
+        Unit test for pyasx.client.Client.lookup()
+        Test lookups are cached when the client has a cache
+        """
+
+        now = [1000.0]
+        client = pyasx.client.Client(cache=pyasx.cache.TTLCache(ttl=10, clock=lambda: now[0]))
+
+        with unittest.mock.patch("requests.get") as mock:
+
+            mock.return_value.json.return_value = { "code": "CBA" }
+
+            pyasx.data.securities.get_security_info("CBA", client=client)
+            pyasx.data.securities.get_security_info("CBA", client=client)
+            self.assertEqual(mock.call_count, 1)
+
+            now[0] += 10
+            pyasx.data.securities.get_security_info("CBA", client=client)
+            self.assertEqual(mock.call_count, 2)
+
+
+    def testMemo(self):
+        """
+        Unit test for pyasx.cache.PayloadMemo via pyasx.data.securities.poll_security_info()
+        Test unchanged payloads aren't normalised again & are flagged unchanged
+        """
+
+        client = pyasx.client.Client(memo=pyasx.cache.PayloadMemo())
+
+        with unittest.mock.patch("requests.get") as mock, \
+                unittest.mock.patch("pyasx.data.securities._normalise_security_info",
+                                    wraps=pyasx.data.securities._normalise_security_info) as normalise:
+
+            mock.return_value.content = b'{"code": "CBA", "last_price": 79.5}'
+
+            first, unchanged = pyasx.data.securities.poll_security_info("CBA", client=client)
+            self.assertFalse(unchanged)
+            self.assertEqual(first["last_price"], 79.5)
+
+            second, unchanged = pyasx.data.securities.poll_security_info("CBA", client=client)
+            self.assertTrue(unchanged)
+            self.assertTrue(second is first)
+            self.assertEqual(normalise.call_count, 1)
+
+            mock.return_value.content = b'{"code": "CBA", "last_price": 79.6}'
+
+            third, unchanged = pyasx.data.securities.poll_security_info("CBA", client=client)
+            self.assertFalse(unchanged)
+            self.assertEqual(third["last_price"], 79.6)
+            self.assertEqual(pyasx.data.securities.get_security_info("CBA", client=client), third)
+            self.assertEqual(normalise.call_count, 2)
+            self.assertEqual(len(client.memo), 1)
+
+
+    def testMemoWithCache(self):
+        """
+        Unit test for pyasx.data.securities.poll_security_info()
+        Test results served from the client's cache are flagged unchanged
+        """
+
+        now = [1000.0]
+        client = pyasx.client.Client(
+            cache=pyasx.cache.TTLCache(ttl=60, clock=lambda: now[0]),
+            memo=pyasx.cache.PayloadMemo()
+        )
+
+        with unittest.mock.patch("requests.get") as mock:
+
+            mock.return_value.content = b'{"code": "CBA", "last_price": 79.5}'
+
+            flags = [pyasx.data.securities.poll_security_info("CBA", client=client)[1] for i in range(0, 3)]
+            self.assertEqual(flags, [False, True, True])
+            self.assertEqual(mock.call_count, 1)
+
+            # expired & changed
+            now[0] += 60
+            mock.return_value.content = b'{"code": "CBA", "last_price": 79.6}'
+
+            info, unchanged = pyasx.data.securities.poll_security_info("CBA", client=client)
+            self.assertFalse(unchanged)
+            self.assertEqual(info["last_price"], 79.6)
+            self.assertEqual(mock.call_count, 2)
+
+
+    def testInvalidJson(self):
+        """
+        Unit test for pyasx.data._fetch_json_payload()
+        Test a payload which isn't JSON raises a LookupError, with or without a memo
+        """
+
+        html = b'<html><body>Down for maintenance</body></html>'
+
+        with unittest.mock.patch("requests.get") as mock:
+
+            mock.return_value.content = html
+            mock.return_value.json.side_effect = ValueError("Expecting value: line 1 column 1 (char 0)")
+
+            for client in (pyasx.client.Client(), pyasx.client.Client(memo=pyasx.cache.PayloadMemo())):
+                with self.assertRaises(pyasx.data.LookupError):
+                    pyasx.data.securities.get_security_info("CBA", client=client)
+
+
+    def testCoalescing(self):
+        """
+        Unit test for pyasx.client.Client.lookup()
+        Test concurrent lookups of the same endpoint share a single request
+        """
+
+        client = pyasx.client.Client()
+        start = threading.Barrier(8)
+        results = []
+
+        def get(endpoint):
+            time.sleep(0.2)  # slow upstream, so all of the lookups overlap
+            return unittest.mock.DEFAULT
+
+        def lookup():
+            start.wait()
+            results.append(pyasx.data.securities.get_security_info("CBA", client=client))
+
+        with unittest.mock.patch("requests.get") as mock:
+
+            mock.side_effect = get
+            mock.return_value.json.return_value = { "code": "CBA" }
+
+            threads = [threading.Thread(target=lookup) for i in range(0, 8)]
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(mock.call_count, 1)
+            self.assertEqual(len(results), 8)
+            self.assertTrue(all(result is results[0] for result in results))
+
+            # once complete the next lookup makes a new request
+            pyasx.data.securities.get_security_info("CBA", client=client)
+            self.assertEqual(mock.call_count, 2)
+
+
+    def testCoalescingErrors(self):
+        """
+        Unit test for pyasx.client.SingleFlight.do()
+        Test the exception is shared by the coalesced callers
+        """
+
+        single_flight = pyasx.client.SingleFlight()
+        release = threading.Event()
+        errors = []
+        loads = []
+
+        def load():
+            loads.append(True)
+            release.wait()
+            raise pyasx.data.LookupError("upstream down")
+
+        def do():
+            try:
+                single_flight.do("key", load)
+            except pyasx.data.LookupError as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=do) for i in range(0, 4)]
+        for thread in threads:
+            thread.start()
+
+        time.sleep(0.1)
+        release.set()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(len(errors), 4)
@@ -0,0 +1,66 @@
+
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import pyasx.config
+
+
+class ConfigTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.config module
+    """
+
+
+    def tearDown(self):
+
+        pyasx.config.load()  # reset back to the defaults
+
+
+    def testDefaults(self):
+        """
+        Unit test for pyasx.config.get()
+        Test the defaults are used when there are no overrides
+        """
+
+        pyasx.config.load()
+
+        for key, value in pyasx.config.DEFAULTS.items():
+            self.assertEqual(pyasx.config.get(key), value)
+
+        self.assertTrue(pyasx.config.get('unknown') is None)
+
+
+    def testYamlOverrides(self):
+        """
+        Unit test for pyasx.config.load()
+        Test values are overridden via a YAML file
+        """
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+
+            yaml_path = os.path.join(temp_dir, "config.yml")
+            with open(yaml_path, "w") as yaml_stream:
+                yaml_stream.write("asx_single_json: http://localhost:8000/share/%s\n")
+
+            pyasx.config.load(yaml_path)
+
+        self.assertEqual(pyasx.config.get('asx_single_json'), "http://localhost:8000/share/%s")
+        self.assertEqual(pyasx.config.get('asx_company_json'), pyasx.config.DEFAULTS['asx_company_json'])
+
+
+    def testLazyImports(self):
+        """
+        Test importing pyasx doesn't import the heavy dependencies
+        """
+
+        code = (
+            "import sys, pyasx.data.companies, pyasx.data.securities;"
+            "pyasx.config.get('asx_single_json');"
+            "print(','.join(m for m in ('requests', 'dateutil', 'yaml') if m in sys.modules))"
+        )
+
+        output = subprocess.check_output([sys.executable, "-c", code], cwd=os.path.dirname(pyasx.__path__[0]))
+        self.assertEqual(output.decode().strip(), "")
@@ -0,0 +1,95 @@
+
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import pyasx.data.bars
+
+
+class BarsTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.data.bars module
+    """
+
+
+    def setUp(self):
+
+        self.builder = pyasx.data.bars.BarBuilder()
+
+
+    def quote(self, last_price, day_volume, ticker="CBA"):
+
+        return { "ticker": ticker, "last_price": last_price, "day_volume": day_volume }
+
+
+    def testAdd(self):
+        """
+        Unit test for pyasx.data.bars.BarBuilder.add()
+        Test quotes are aggregated into 1 & 5 minute bars
+        """
+
+        start = 1521079200  # on a 5 minute boundary
+
+        self.builder.add(self.quote(79.3, 1000), start + 5)
+        self.builder.add(self.quote(79.5, 1600), start + 35)
+        self.builder.add(self.quote(79.1, 2000), start + 65)
+        self.builder.add(self.quote("", 2500), start + 70)  # skipped, no price
+        self.builder.add({ "primary_share": self.quote(79.2, 3000) }, start + 310)
+
+        bars = self.builder.bars("cba")
+        self.assertEqual(bars["ticker"], "CBA")
+        self.assertEqual(list(bars["time"]), [start, start + 60, start + 300])
+        self.assertEqual(list(bars["open"]), [79.3, 79.1, 79.2])
+        self.assertEqual(list(bars["high"]), [79.5, 79.1, 79.2])
+        self.assertEqual(list(bars["close"]), [79.5, 79.1, 79.2])
+        # the first quote only sets the day volume baseline
+        self.assertEqual(list(bars["volume"]), [600, 400, 1000])
+
+        bars = self.builder.bars("CBA", 300)
+        self.assertEqual(list(bars["time"]), [start, start + 300])
+        self.assertEqual(list(bars["low"]), [79.1, 79.2])
+        self.assertEqual(list(bars["volume"]), [1000, 1000])
+
+        # day volume reset, i.e. a new trading day
+        self.builder.add(self.quote(80.0, 500), start + 86400)
+        self.assertEqual(self.builder.bars("CBA")["volume"][-1], 500)
+
+        self.assertEqual(len(self.builder.bars("BHP")["time"]), 0)
+        self.assertRaises(ValueError, self.builder.bars, "CBA", 120)
+
+
+    def testRingBuffer(self):
+        """
+        Unit test for pyasx.data.bars.BarRing
+        Test the oldest bars are overwritten once full
+        """
+
+        builder = pyasx.data.bars.BarBuilder(intervals=(60,), capacity=3)
+
+        for minute in range(0, 5):
+            builder.add(self.quote(10 + minute, 100 * minute), minute * 60)
+
+        bars = builder.bars("CBA")
+        self.assertEqual(list(bars["time"]), [120, 180, 240])
+        self.assertEqual(list(bars["close"]), [12, 13, 14])
+
+        builder.reset("CBA")
+        self.assertEqual(builder.tickers(), [])
+
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def testToNumpy(self):
+        """
+        Unit test for pyasx.data.bars.BarBuilder.to_numpy()
+        """
+
+        self.builder.add(self.quote(79.3, 1000), 0)
+        self.builder.add(self.quote(79.5, 1600), 60)
+
+        bars = self.builder.to_numpy("CBA")
+        self.assertEqual(bars["close"].dtype, numpy.float64)
+        self.assertEqual(bars["volume"].tolist(), [0, 600])
@@ -126,8 +126,10 @@ class CompaniesTest(unittest.TestCase):
         with unittest.mock.patch("requests.get") as mock:
 
             # set up mock iterator for response.iter_content()
+            bytes_mock = bytes(self.get_listed_companies_mock, "utf-8")
+
             instance = mock.return_value
-            instance.iter_content.return_value = iter([self.get_listed_companies_mock])
+            instance.iter_content.return_value = iter([bytes_mock])
 
             # this is the test
             companies = pyasx.data.companies.get_listed_companies()
@@ -144,6 +146,49 @@ class CompaniesTest(unittest.TestCase):
                 i += 1
 
 
+    def testGetListedCompaniesCached(self):
+        """
+        Unit test for pyasx.data.company.get_listed_companies()
+        Test rows split across chunks & the compressed copy kept in bulk_cache_dir
+        """
+
+        import gzip
+        import os
+        import tempfile
+        import pyasx.client
+
+        csv_bytes = bytes(self.get_listed_companies_mock.replace("\n", "\r\n"), "utf-8")
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                unittest.mock.patch("requests.get") as mock:
+
+            client = pyasx.client.Client()
+            client.set("bulk_cache_dir", cache_dir)
+            client.set("bulk_chunk_size", 7)
+
+            instance = mock.return_value
+            instance.status_code = 200
+            instance.headers = { "ETag": "v1" }
+            instance.iter_content.side_effect = lambda chunk_size: iter(
+                [csv_bytes[i:i + chunk_size] for i in range(0, len(csv_bytes), chunk_size)]
+            )
+
+            companies = pyasx.data.companies.get_listed_companies(client)
+            self.assertEqual([company["ticker"] for company in companies], ["MOQ", "1PG", "ONT", "1ST"])
+            self.assertEqual(mock.call_args[1]["headers"]["Accept-Encoding"], "gzip, deflate")
+
+            cache_path = os.path.join(cache_dir, "ASXListedCompanies.csv.gz")
+            with gzip.open(cache_path, "rb") as cache_stream:
+                self.assertEqual(cache_stream.read(), csv_bytes)
+
+            # unchanged, so parsed from the cached copy
+            instance.status_code = 304
+            instance.iter_content.side_effect = AssertionError("not downloaded")
+
+            self.assertEqual(pyasx.data.companies.get_listed_companies(client), companies)
+            self.assertEqual(mock.call_args[1]["headers"]["If-None-Match"], "v1")
+
+
     def testGetListedCompaniesLive(self):
         """
         Unit test for pyasx.data.company.get_listed_companies()
@@ -188,6 +233,46 @@ class CompaniesTest(unittest.TestCase):
             self.assertTrue(len(company["primary_share"]))
 
 
+    def testGetCompanyInfoSectionsMocked(self):
+        """
+        Unit test for pyasx.data.company.get_company_info()
+        Test only the requested sections are pulled & normalised
+        """
+
+        with unittest.mock.patch("requests.get") as mock:
+
+            instance = mock.return_value
+            instance.status_code = 200
+            instance.json.return_value = self.get_company_info_mock
+
+            company = pyasx.data.companies.get_company_info('CBA', sections=['last_dividend'])
+
+            self.assertEqual(mock.call_count, 1)  # primary share not pulled separately
+            self.assertTrue(mock.call_args[0][0].endswith("/company/CBA?fields=last_dividend"))
+            self.assertEqual(company["gics_sector"], "Financials")
+            self.assertTrue(len(company["last_dividend"]))
+            self.assertFalse("primary_share" in company)
+
+            company = pyasx.data.companies.get_company_info('CBA', sections=[])
+            self.assertTrue(mock.call_args[0][0].endswith("/company/CBA"))
+            self.assertFalse("last_dividend" in company)
+
+            mock.reset_mock()
+            instance.json.return_value = dict(self.get_company_info_mock, primary_share={ "code": "GEN" })
+
+            company = pyasx.data.companies.get_company_info('CBA', sections=['primary_share'])
+            self.assertEqual(mock.call_count, 1)
+            self.assertTrue(mock.call_args[0][0].endswith("?fields=primary_share"))
+            self.assertEqual(company["primary_share"]["ticker"], "GEN")
+            self.assertFalse("indices" in company["primary_share"])
+
+            company = pyasx.data.companies.get_company_info('CBA', sections=['indices'])
+            self.assertTrue(mock.call_args[0][0].endswith("?fields=primary_share,primary_share.indices"))
+            self.assertEqual(company["primary_share"]["indices"], [])
+
+            self.assertRaises(ValueError, pyasx.data.companies.get_company_info, 'CBA', sections=['reports'])
+
+
     def testGetCompanyInfoLive(self):
         """
         Unit test for pyasx.data.company.get_listed_companies()
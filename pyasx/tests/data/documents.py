@@ -0,0 +1,115 @@
+
+
+import hashlib
+import os
+import tempfile
+import unittest
+import unittest.mock
+import pyasx.data.documents
+
+
+class DocumentsTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.data.documents module
+    """
+
+
+    def setUp(self):
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+
+        self.documents = {
+            "http://asx/1.pdf": b"%PDF first document",
+            "http://asx/2.pdf": b"%PDF second document",
+            "http://asx/3.pdf": b"%PDF first document",  # same content as 1.pdf
+        }
+
+        self.announcements = [
+            { "url": url, "title": "TITLE" } for url in sorted(self.documents)
+        ]
+
+
+    def tearDown(self):
+
+        self.temp_dir.cleanup()
+
+
+    def get(self, url, headers={}, stream=False):
+
+        content = self.documents[url]
+
+        response = unittest.mock.MagicMock()
+        response.status_code = 200
+
+        if "Range" in headers:
+            offset = int(headers["Range"][len("bytes="):-1])
+            content = content[offset:]
+            response.status_code = 206
+
+        response.iter_content.return_value = iter([content[:5], content[5:]])
+
+        return response
+
+
+    def testDownloadAnnouncements(self):
+        """
+        Unit test for pyasx.data.documents.download_announcements()
+        Test documents are stored content addressed & skipped once downloaded
+        """
+
+        with unittest.mock.patch("requests.get") as mock:
+
+            mock.side_effect = self.get
+
+            stats = pyasx.data.documents.download_announcements(self.announcements * 2, self.directory)
+
+            self.assertEqual(stats["downloaded"], 3)
+            self.assertEqual(stats["skipped"], 0)
+            self.assertEqual(stats["failed"], {})
+            self.assertEqual(stats["bytes"], sum(len(content) for content in self.documents.values()))
+
+            # identical documents are stored once
+            self.assertEqual(stats["paths"]["http://asx/1.pdf"], stats["paths"]["http://asx/3.pdf"])
+
+            content_hash = hashlib.sha256(self.documents["http://asx/2.pdf"]).hexdigest()
+            path = stats["paths"]["http://asx/2.pdf"]
+            self.assertEqual(os.path.basename(path), "%s.pdf" % content_hash)
+
+            with open(path, "rb") as document_stream:
+                self.assertEqual(document_stream.read(), self.documents["http://asx/2.pdf"])
+
+            stats = pyasx.data.documents.download_announcements(self.announcements, self.directory)
+            self.assertEqual(stats["downloaded"], 0)
+            self.assertEqual(stats["skipped"], 3)
+            self.assertEqual(mock.call_count, 3)
+
+
+    def testResume(self):
+        """
+        Unit test for pyasx.data.documents.download_announcements()
+        Test partial downloads are resumed via a range request
+        """
+
+        url = "http://asx/2.pdf"
+        content = self.documents[url]
+
+        os.makedirs(os.path.join(self.directory, "partial"))
+        with open(pyasx.data.documents._partial_path(self.directory, url), "wb") as partial_stream:
+            partial_stream.write(content[:7])
+
+        with unittest.mock.patch("requests.get") as mock:
+
+            mock.side_effect = self.get
+
+            stats = pyasx.data.documents.download_announcements([ { "url": url } ], self.directory)
+
+            self.assertEqual(mock.call_args[1]["headers"], { "Range": "bytes=7-" })
+            self.assertEqual(stats["resumed"], 1)
+            self.assertEqual(stats["bytes"], len(content) - 7)
+
+        path = pyasx.data.documents.get_document_path(self.directory, url)
+        self.assertEqual(os.path.basename(path), "%s.pdf" % hashlib.sha256(content).hexdigest())
+
+        with open(path, "rb") as document_stream:
+            self.assertEqual(document_stream.read(), content)
@@ -0,0 +1,99 @@
+
+
+import tempfile
+import unittest
+import unittest.mock
+import pyasx.data.history
+
+
+class HistoryTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.data.history module
+    """
+
+
+    def setUp(self):
+
+        self.get_historical_prices_mock = [
+            b"Code,Date,Open,High,Low,Close,Volume",
+            b"CBA,20180102,79.2,79.6,78.9,79.5,1876203",
+            b"CBA,20180103,79.6,80.1,79.3,80.0,2061298",
+            b"CBA,20180104,80.0,80.5,79.8,80.2,1500000",
+        ]
+
+
+    def testGetHistoricalPricesMocked(self):
+        """
+        Unit test for pyasx.data.history.get_historical_prices()
+        Test pulling mock data + verify
+        """
+
+        with unittest.mock.patch("requests.get") as mock:
+
+            mock.return_value.iter_lines.return_value = iter(self.get_historical_prices_mock)
+
+            prices = pyasx.data.history.get_historical_prices('cba')
+
+            self.assertEqual(prices["ticker"], "CBA")
+            self.assertEqual(list(prices["date"]), [20180102, 20180103, 20180104])
+            self.assertEqual(list(prices["open"]), [79.2, 79.6, 80.0])
+            self.assertEqual(list(prices["high"]), [79.6, 80.1, 80.5])
+            self.assertEqual(list(prices["low"]), [78.9, 79.3, 79.8])
+            self.assertEqual(list(prices["close"]), [79.5, 80.0, 80.2])
+            self.assertEqual(list(prices["volume"]), [1876203, 2061298, 1500000])
+            self.assertEqual(prices["volume"].typecode, "q")
+
+
+    def testUpdateHistoricalPrices(self):
+        """
+        Unit test for pyasx.data.history.update_historical_prices()
+        Test only new days are appended to the store
+        """
+
+        with tempfile.TemporaryDirectory() as store_dir:
+
+            with unittest.mock.patch("requests.get") as mock:
+
+                mock.return_value.iter_lines.side_effect = lambda: iter(self.get_historical_prices_mock[:3])
+
+                result = pyasx.data.history.update_historical_prices(["CBA", "cba"], store_dir)
+                self.assertEqual(result, { "updated": { "CBA": 2 }, "failed": {} })
+
+                mock.return_value.iter_lines.side_effect = lambda: iter(self.get_historical_prices_mock)
+
+                result = pyasx.data.history.update_historical_prices(["CBA"], store_dir)
+                self.assertEqual(result["updated"], { "CBA": 1 })
+
+            prices = pyasx.data.history.load_historical_prices(store_dir, "CBA")
+            self.assertEqual(list(prices["date"]), [20180102, 20180103, 20180104])
+            self.assertEqual(list(prices["close"]), [79.5, 80.0, 80.2])
+
+
+    def testUpdateHistoricalPricesDescending(self):
+        """
+        Unit test for pyasx.data.history.update_historical_prices()
+        Test a newest first CSV is stored in date order, without repeated days
+        """
+
+        descending_mock = [self.get_historical_prices_mock[0]] + self.get_historical_prices_mock[:0:-1]
+
+        with tempfile.TemporaryDirectory() as store_dir:
+
+            with unittest.mock.patch("requests.get") as mock:
+
+                mock.return_value.iter_lines.side_effect = lambda: iter(descending_mock[:1] + descending_mock[2:])
+
+                result = pyasx.data.history.update_historical_prices(["CBA"], store_dir)
+                self.assertEqual(result["updated"], { "CBA": 2 })
+
+                mock.return_value.iter_lines.side_effect = lambda: iter(descending_mock + descending_mock[1:2])
+
+                result = pyasx.data.history.update_historical_prices(["CBA"], store_dir)
+                self.assertEqual(result["updated"], { "CBA": 1 })
+
+                result = pyasx.data.history.update_historical_prices(["CBA"], store_dir)
+                self.assertEqual(result["updated"], { "CBA": 0 })
+
+            prices = pyasx.data.history.load_historical_prices(store_dir, "CBA")
+            self.assertEqual(list(prices["date"]), [20180102, 20180103, 20180104])
+            self.assertEqual(list(prices["close"]), [79.5, 80.0, 80.2])
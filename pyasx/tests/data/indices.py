@@ -0,0 +1,98 @@
+
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+import pyasx.data
+import pyasx.data.indices
+
+
+class IndicesTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.data.indices module
+    """
+
+
+    def setUp(self):
+
+        self.securities = {
+            "CBA": {
+                "ticker": "CBA",
+                "indices": [
+                    { "code": "XTL", "name": "S&P/ASX 20" },
+                    { "code": "XJO", "name": "S&P/ASX 200" }
+                ]
+            },
+            "MOQ": {
+                "ticker": "MOQ",
+                "indices": []
+            },
+            "BHP": {
+                "ticker": "BHP",
+                "indices": [
+                    { "code": "XJO", "name": "S&P/ASX 200" }
+                ]
+            }
+        }
+
+
+    def get_security_info(self, ticker):
+
+        if ticker not in self.securities:
+            raise pyasx.data.UnknownTickerException("Unknown security ticker %s" % ticker)
+
+        return self.securities[ticker]
+
+
+    def testUpdate(self):
+        """
+        Unit test for pyasx.data.indices.IndexMembership.update()
+        """
+
+        membership = pyasx.data.indices.IndexMembership()
+
+        for security_info in self.securities.values():
+            membership.update(security_info)
+
+        self.assertEqual(membership.constituents("XJO"), frozenset(["CBA", "BHP"]))
+        self.assertEqual(membership.constituents("xtl"), frozenset(["CBA"]))
+        self.assertEqual(membership.memberships("CBA"), frozenset(["XTL", "XJO"]))
+        self.assertEqual(membership.memberships("MOQ"), frozenset())
+        self.assertEqual(membership.index_name("XJO"), "S&P/ASX 200")
+
+        # CBA drops out of the ASX 20
+        membership.update({ "primary_share": self.securities["BHP"] })
+        membership.update({ "ticker": "CBA", "indices": [ { "code": "XJO", "name": "S&P/ASX 200" } ] })
+
+        self.assertEqual(membership.memberships("CBA"), frozenset(["XJO"]))
+        self.assertFalse("XTL" in membership.index_codes())
+
+
+    def testRefresh(self):
+        """
+        Unit test for pyasx.data.indices.IndexMembership.refresh()
+        Test delisted tickers are discarded & the map can be persisted
+        """
+
+        with unittest.mock.patch("pyasx.data.securities.get_security_info") as mock:
+
+            mock.side_effect = lambda ticker, client: self.get_security_info(ticker)
+
+            membership = pyasx.data.indices.IndexMembership()
+            membership.refresh(["CBA", "BHP", "MOQ"])
+            self.assertEqual(membership.constituents("XJO"), frozenset(["CBA", "BHP"]))
+
+            del self.securities["BHP"]
+            membership.refresh(["BHP"])
+            self.assertEqual(membership.constituents("XJO"), frozenset(["CBA"]))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+
+            path = os.path.join(temp_dir, "indices.json")
+            membership.save(path)
+
+            loaded = pyasx.data.indices.IndexMembership.load(path)
+            self.assertEqual(loaded.constituents("XJO"), frozenset(["CBA"]))
+            self.assertEqual(loaded.memberships("CBA"), frozenset(["XTL", "XJO"]))
+            self.assertEqual(loaded.index_name("XTL"), "S&P/ASX 20")
@@ -0,0 +1,88 @@
+
+
+import math
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import pyasx.data.screener
+
+
+@unittest.skipIf(numpy is None, "requires numpy")
+class ScreenerTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.data.screener module
+    """
+
+
+    def setUp(self):
+
+        self.securities = [
+            { "ticker": "CBA", "pe": 12.68, "annual_dividend_yield": 5.91, "market_cap": 131226760184, "day_change_percent": "-2.751%" },
+            { "ticker": "WBC", "pe": 11.5, "annual_dividend_yield": 6.8, "market_cap": 95000000000, "day_change_percent": "0.5%" },
+            { "ticker": "BHP", "pe": 16.2, "annual_dividend_yield": 4.1, "market_cap": 150000000000, "day_change_percent": "1%" },
+            { "ticker": "MOQ", "pe": "", "annual_dividend_yield": "", "market_cap": 10000000, "day_change_percent": "" },
+        ]
+
+        self.companies = [
+            { "ticker": "CBA", "gics_sector": "Financials", "gics_industry": "Banks", "name": "COMMONWEALTH BANK OF AUSTRALIA." },
+            { "ticker": "WBC", "gics_sector": "Financials", "gics_industry": "Banks", "name": "WESTPAC BANKING CORPORATION" },
+            { "ticker": "BHP", "gics_sector": "Materials", "gics_industry": "Materials", "name": "BHP BILLITON LIMITED" },
+            { "ticker": "MOQ", "gics_industry": "Software & Services", "name": "MOQ LIMITED" },
+        ]
+
+        self.screener = pyasx.data.screener.Screener(self.securities, self.companies)
+
+
+    def tickers(self, results):
+
+        return [result["ticker"] for result in results]
+
+
+    def testScreen(self):
+        """
+        Unit test for pyasx.data.screener.Screener.screen()
+        """
+
+        results = self.screener.screen(
+            "pe < 15 and annual_dividend_yield > 5 and market_cap > 1e9 and gics_industry == 'Banks'",
+            sort_by="annual_dividend_yield"
+        )
+        self.assertEqual(self.tickers(results), ["WBC", "CBA"])
+        self.assertEqual(results[1]["name"], "COMMONWEALTH BANK OF AUSTRALIA.")
+        self.assertEqual(results[1]["day_change_percent"], -2.751)
+
+        results = self.screener.screen("gics_sector in ['Materials', 'Financials']", sort_by="market_cap", limit=2, fields=["ticker", "market_cap"])
+        self.assertEqual(results, [
+            { "ticker": "BHP", "market_cap": 150000000000.0 },
+            { "ticker": "CBA", "market_cap": 131226760184.0 },
+        ])
+
+        # missing values (NaN) sort last
+        self.assertEqual(self.tickers(self.screener.screen("not pe >= 15", sort_by="pe", descending=False)), ["WBC", "CBA", "MOQ"])
+        self.assertEqual(self.tickers(self.screener.screen("10 < pe < 15 or market_cap / 1e6 < 100", sort_by="pe"))[-1], "MOQ")
+        self.assertEqual(len(self.screener.screen()), 4)
+
+        self.assertRaises(ValueError, self.screener.mask, "unknown > 1")
+        self.assertRaises(ValueError, self.screener.mask, "__import__('os')")
+
+
+    def testUpdate(self):
+        """
+        Unit test for pyasx.data.screener.Screener.update()
+        Test polled quotes update the snapshot in place
+        """
+
+        self.screener.update([
+            { "ticker": "BHP", "pe": 14.0, "annual_dividend_yield": 5.5, "market_cap": 150000000000 },
+            { "primary_share": { "ticker": "NAB", "pe": 13.0, "annual_dividend_yield": 7.0, "market_cap": 80000000000 },
+              "ticker": "NAB", "gics_sector": "Financials", "gics_industry": "Banks" },
+        ])
+
+        self.assertEqual(len(self.screener), 5)
+        self.assertEqual(self.tickers(self.screener.screen("pe < 15 and annual_dividend_yield > 5", sort_by="pe")), ["BHP", "NAB", "CBA", "WBC"])
+        self.assertEqual(self.screener.screen("ticker == 'NAB'")[0]["gics_industry"], "Banks")
+        self.assertTrue(math.isnan(self.screener.screen("ticker == 'MOQ'")[0]["pe"]))
@@ -0,0 +1,170 @@
+
+
+import datetime
+import os
+import tempfile
+import unittest
+import unittest.mock
+import pyasx.data.search
+
+
+class SearchTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.data.search module
+    """
+
+
+    def setUp(self):
+
+        self.announcements = {
+            "CBA": [
+                self.announcement("Capital Raising Update", 2018, 3, 15),
+                self.announcement("Trading Halt", 2018, 3, 12),
+                self.announcement("Raising of Capital Notes", 2018, 2, 1),
+            ],
+            "BHP": [
+                self.announcement("Trading Halt", 2018, 1, 5),
+                self.announcement("Completion of Capital Raising", 2017, 12, 1),
+            ]
+        }
+
+
+    def announcement(self, title, year, month, day):
+
+        return {
+            "title": title,
+            "url": "http://asx/%s.pdf" % title.replace(" ", ""),
+            "release_date": datetime.datetime(year, month, day),
+            "document_date": datetime.datetime(year, month, day),
+        }
+
+
+    def buildIndex(self):
+
+        index = pyasx.data.search.AnnouncementIndex()
+
+        for ticker, announcements in self.announcements.items():
+            index.add(ticker, announcements)
+
+        return index
+
+
+    def assertResults(self, results, expected):
+
+        self.assertEqual([(result["ticker"], result["title"]) for result in results], expected)
+
+
+    def testSearch(self):
+        """
+        Unit test for pyasx.data.search.AnnouncementIndex.search()
+        Test term, phrase & date range queries
+        """
+
+        index = self.buildIndex()
+        self.assertEqual(len(index), 5)
+
+        # already indexed announcements are skipped
+        self.assertEqual(index.add("cba", self.announcements["CBA"]), 0)
+
+        self.assertResults(index.search("trading halt"), [("CBA", "Trading Halt"), ("BHP", "Trading Halt")])
+        self.assertResults(index.search("halt", ticker="bhp"), [("BHP", "Trading Halt")])
+
+        self.assertResults(index.search("capital raising"), [
+            ("CBA", "Capital Raising Update"),
+            ("CBA", "Raising of Capital Notes"),
+            ("BHP", "Completion of Capital Raising"),
+        ])
+
+        self.assertResults(index.search('"capital raising"'), [
+            ("CBA", "Capital Raising Update"),
+            ("BHP", "Completion of Capital Raising"),
+        ])
+
+        self.assertResults(index.search('"capital raising"', start_date=20180101), [("CBA", "Capital Raising Update")])
+        self.assertResults(index.search("capital", end_date=20180201, limit=1), [("CBA", "Raising of Capital Notes")])
+
+        self.assertEqual(index.search("dividend"), [])
+        self.assertEqual(index.search(""), [])
+
+        # an empty query matches every announcement in the date range
+        self.assertResults(index.search("", start_date=20180101, end_date=20180312), [
+            ("CBA", "Trading Halt"),
+            ("CBA", "Raising of Capital Notes"),
+            ("BHP", "Trading Halt"),
+        ])
+        self.assertResults(index.search("", end_date=20180105, ticker="BHP"), [
+            ("BHP", "Trading Halt"),
+            ("BHP", "Completion of Capital Raising"),
+        ])
+
+
+    def testSaveLoad(self):
+        """
+        Unit test for pyasx.data.search.AnnouncementIndex.save() & load()
+        Test a saved index is searchable & can be added to once loaded
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            self.buildIndex().save(directory)
+
+            index = pyasx.data.search.AnnouncementIndex.load(directory)
+            self.assertEqual(len(index), 5)
+
+            result = index.search('"trading halt"', ticker="CBA")[0]
+            self.assertEqual(result, {
+                "ticker": "CBA",
+                "title": "Trading Halt",
+                "url": "http://asx/TradingHalt.pdf",
+                "date": 20180312
+            })
+
+            self.assertEqual(index.add("CBA", self.announcements["CBA"]), 0)
+            self.assertEqual(index.add("CBA", [self.announcement("Trading Halt", 2018, 4, 1)]), 1)
+            self.assertEqual(len(index.search("trading halt")), 3)
+
+            index.save(directory)
+
+            index = pyasx.data.search.AnnouncementIndex.load(directory)
+            self.assertResults(index.search("halt", start_date=20180401), [("CBA", "Trading Halt")])
+            self.assertEqual(len(index.search("capital")), 3)
+
+            # date range queries cover both the saved & added announcements
+            index.add("BHP", [self.announcement("Quarterly Report", 2018, 3, 20)])
+            self.assertResults(index.search("", start_date=20180312, end_date=20180331), [
+                ("BHP", "Quarterly Report"),
+                ("CBA", "Capital Raising Update"),
+                ("CBA", "Trading Halt"),
+            ])
+
+
+    def testAddLoaded(self):
+        """
+        Unit test for pyasx.data.search.AnnouncementIndex.add()
+        Test announcements already saved are skipped without reading every doc
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            self.buildIndex().save(directory)
+
+            index = pyasx.data.search.AnnouncementIndex.load(directory)
+
+            with unittest.mock.patch.object(index._segment, "doc", wraps=index._segment.doc) as doc:
+
+                self.assertEqual(index.add("CBA", self.announcements["CBA"]), 0)
+                self.assertEqual(doc.call_count, 3)  # only each matching doc is compared
+
+                doc.reset_mock()
+                self.assertEqual(index.add("CBA", [self.announcement("Trading Halt", 2018, 4, 1)]), 1)
+                self.assertEqual(doc.call_count, 0)
+
+            self.assertEqual(len(index), 6)
+
+            # indexes saved without the digests still skip saved announcements
+            os.remove(os.path.join(directory, "digests.bin"))
+            os.remove(os.path.join(directory, "digest_docs.bin"))
+
+            index = pyasx.data.search.AnnouncementIndex.load(directory)
+            self.assertEqual(index.add("BHP", self.announcements["BHP"]), 0)
+            self.assertEqual(index.add("BHP", [self.announcement("Trading Halt", 2018, 4, 1)]), 1)
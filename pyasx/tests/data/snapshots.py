@@ -0,0 +1,71 @@
+
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+import pyasx.data.snapshots
+
+
+class SnapshotsTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.data.snapshots module
+    """
+
+
+    def setUp(self):
+
+        self.old_companies = [
+            { "ticker": "MOQ", "name": "MOQ LIMITED", "gics_industry": "Software & Services" },
+            { "ticker": "1PG", "name": "1-PAGE LIMITED", "gics_industry": "Software & Services" },
+            { "ticker": "ONT", "name": "1300 SMILES LIMITED", "gics_industry": "Health Care Equipment & Services" },
+        ]
+
+        self.new_companies = [
+            { "ticker": "ONT", "name": "1300 SMILES LIMITED", "gics_industry": "Health Care Equipment & Services" },
+            { "ticker": "MOQ", "name": "MOQ GROUP LIMITED", "gics_industry": "Software & Services" },
+            { "ticker": "1ST", "name": "1ST GROUP LIMITED", "gics_industry": "Health Care Equipment & Services" },
+        ]
+
+
+    def testDiff(self):
+        """
+        Unit test for pyasx.data.snapshots.diff()
+        """
+
+        delta = pyasx.data.snapshots.diff_listed_companies(self.old_companies, self.new_companies)
+
+        self.assertEqual([row["ticker"] for row in delta["added"]], ["1ST"])
+        self.assertEqual([row["ticker"] for row in delta["removed"]], ["1PG"])
+
+        self.assertEqual(len(delta["changed"]), 1)
+        self.assertEqual(delta["changed"][0]["key"], "MOQ")
+        self.assertEqual(delta["changed"][0]["fields"], ["name"])
+        self.assertEqual(delta["changed"][0]["old"]["name"], "MOQ LIMITED")
+        self.assertEqual(delta["changed"][0]["new"]["name"], "MOQ GROUP LIMITED")
+
+
+    def testGetListedCompaniesDelta(self):
+        """
+        Unit test for pyasx.data.snapshots.get_listed_companies_delta()
+        Test the snapshot is persisted between runs
+        """
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+
+            path = os.path.join(temp_dir, "companies.json")
+
+            with unittest.mock.patch("pyasx.data.companies.get_listed_companies") as mock:
+
+                mock.return_value = self.old_companies
+                delta = pyasx.data.snapshots.get_listed_companies_delta(path)
+                self.assertEqual(len(delta["added"]), 3)
+
+                mock.return_value = self.new_companies
+                delta = pyasx.data.snapshots.get_listed_companies_delta(path)
+                self.assertEqual(len(delta["added"]), 1)
+                self.assertEqual(len(delta["removed"]), 1)
+                self.assertEqual(len(delta["changed"]), 1)
+
+                delta = pyasx.data.snapshots.get_listed_companies_delta(path)
+                self.assertEqual(delta, { "added": [], "removed": [], "changed": [] })
@@ -0,0 +1,112 @@
+
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import uuid
+import pyasx.data.universe
+
+
+class UniverseTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.data.universe module
+    """
+
+
+    def setUp(self):
+
+        self.companies = [
+            { "ticker": "MOQ", "name": "MOQ LIMITED", "gics_industry": "Software & Services" },
+            { "ticker": "CBA", "name": "COMMONWEALTH BANK OF AUSTRALIA.", "gics_industry": "Banks" },
+            { "ticker": "BHP", "name": "BHP BILLITON LIMITED", "gics_industry": "Materials" },
+        ]
+
+        self.securities = [
+            { "ticker": "IJH", "name": "ISHARES MID-CAP ETF", "type": "CHESS DEPOSITARY INTERESTS 1:1 ISHS&P400", "isin": "AU000000IJH2" },
+            { "ticker": "CBA", "name": "COMMONWEALTH BANK.", "type": "ORDINARY FULLY PAID", "isin": "AU000000CBA7" },
+        ]
+
+
+    def assertUniverse(self, universe):
+
+        self.assertEqual(len(universe.companies), 3)
+        self.assertEqual(universe.companies.tickers(), ["BHP", "CBA", "MOQ"])
+        self.assertEqual(universe.companies.get("cba"), self.companies[1])
+        self.assertEqual(universe.companies[-1], self.companies[0])
+        self.assertIsNone(universe.companies.get("NAB"))
+        self.assertIsNone(universe.companies.get("ZZZ"))
+
+        self.assertEqual(list(universe.securities), [self.securities[1], self.securities[0]])
+        self.assertEqual(universe.securities.get("IJH")["isin"], "AU000000IJH2")
+
+
+    def testAttach(self):
+        """
+        Unit test for pyasx.data.universe.publish_universe() & Universe.attach()
+        Test a published universe can be attached to, including from another process
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            path = os.path.join(directory, "universe")
+
+            pyasx.data.universe.publish_universe(path, self.companies, self.securities)
+
+            with pyasx.data.universe.Universe.attach(path) as universe:
+                self.assertUniverse(universe)
+
+            output = subprocess.check_output([
+                sys.executable, "-c",
+                "import pyasx.data.universe, sys; "
+                "print(pyasx.data.universe.Universe.attach(sys.argv[1]).companies.get('MOQ')['name'])",
+                path
+            ], cwd=os.path.dirname(os.path.dirname(pyasx.__file__)))
+            self.assertEqual(output.decode().strip(), "MOQ LIMITED")
+
+            # re-publishing doesn't disturb attached universes
+            universe = pyasx.data.universe.Universe.attach(path)
+            pyasx.data.universe.publish_universe(path, [], self.securities)
+
+            self.assertEqual(len(universe.companies), 3)
+            universe.close()
+
+            with pyasx.data.universe.Universe.attach(path) as universe:
+                self.assertEqual(len(universe.companies), 0)
+                self.assertIsNone(universe.companies.get("CBA"))
+
+            self.assertRaises(ValueError, pyasx.data.universe.Universe, b"not a universe")
+
+
+    def testAttachSharedMemory(self):
+        """
+        Unit test for pyasx.data.universe.publish_universe_shared_memory() &
+        Universe.attach_shared_memory()
+        """
+
+        name = "pyasx-test-%s" % uuid.uuid4().hex[:8]
+
+        block = pyasx.data.universe.publish_universe_shared_memory(name, self.companies, self.securities)
+
+        try:
+
+            with pyasx.data.universe.Universe.attach_shared_memory(name) as universe:
+                self.assertUniverse(universe)
+
+            # workers attaching & exiting one after another mustn't unlink the block
+            for worker in range(0, 2):
+
+                output = subprocess.check_output([
+                    sys.executable, "-c",
+                    "import pyasx.data.universe, sys\n"
+                    "with pyasx.data.universe.Universe.attach_shared_memory(sys.argv[1]) as universe:\n"
+                    "    print(universe.companies.get('CBA')['name'])",
+                    name
+                ], cwd=os.path.dirname(os.path.dirname(pyasx.__file__)), stderr=subprocess.STDOUT)
+                self.assertEqual(output.decode().strip(), "COMMONWEALTH BANK OF AUSTRALIA.")
+
+        finally:
+
+            block.close()
+            block.unlink()
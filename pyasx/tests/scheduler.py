@@ -0,0 +1,122 @@
+
+
+import unittest
+import pyasx.data
+import pyasx.scheduler
+
+
+class SchedulerTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.scheduler module
+    """
+
+
+    def setUp(self):
+
+        self.now = 1000.0
+        self.fetched = []
+
+        self.scheduler = pyasx.scheduler.SweepScheduler(
+            fetch=self.fetch,
+            requests_per_second=2,
+            clock=lambda: self.now
+        )
+
+
+    def fetch(self, ticker):
+
+        self.fetched.append(ticker)
+
+        if ticker == "XYZ":
+            raise pyasx.data.UnknownTickerException("Unknown security ticker XYZ")
+
+        if ticker == "BAD":
+            raise ValueError("Expecting value: line 1 column 1 (char 0)")
+
+        return {
+            "ticker": ticker,
+            "average_daily_volume": 2000000 if ticker == "BHP" else 10,
+            "indices": [ { "code": "XJO", "name": "S&P/ASX 200" } ] if ticker == "CBA" else []
+        }
+
+
+    def testDeriveTier(self):
+        """
+        Unit test for pyasx.scheduler.derive_tier()
+        """
+
+        self.assertEqual(pyasx.scheduler.derive_tier(self.fetch("CBA")), "high")
+        self.assertEqual(pyasx.scheduler.derive_tier(self.fetch("BHP")), "medium")
+        self.assertEqual(pyasx.scheduler.derive_tier(self.fetch("MOQ")), "low")
+        self.assertEqual(pyasx.scheduler.derive_tier({ "primary_share": self.fetch("CBA") }), "high")
+
+
+    def testRunPendingBudget(self):
+        """
+        Unit test for pyasx.scheduler.SweepScheduler.run_pending()
+        Test the request budget is respected and tickers are rescheduled
+        """
+
+        self.scheduler.add("CBA", tier="high")
+        self.scheduler.add("MOQ", staleness=60)
+        self.scheduler.add("XYZ", tier="low")
+
+        results = self.scheduler.run_pending()
+        self.assertEqual([ticker for ticker, result, error in results], ["CBA", "MOQ"])
+
+        self.now += 1
+        results = self.scheduler.run_pending()
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][0], "XYZ")
+        self.assertTrue(isinstance(results[0][2], pyasx.data.UnknownTickerException))
+
+        # nothing is due until the high tier staleness has passed
+        self.now += 10
+        self.assertEqual(self.scheduler.run_pending(), [])
+        self.assertEqual(self.scheduler.next_due(), 1030.0)
+
+        self.now += 20
+        results = self.scheduler.run_pending()
+        self.assertEqual([ticker for ticker, result, error in results], ["CBA"])
+
+
+    def testAutoTier(self):
+        """
+        Unit test for pyasx.scheduler.SweepScheduler.run_pending()
+        Test tickers without a tier are tiered from their lookup result
+        """
+
+        self.scheduler.add("CBA")
+        self.scheduler.add("BHP")
+        self.scheduler.run_pending()
+
+        self.now += pyasx.scheduler.TIERS["high"]
+        results = self.scheduler.run_pending()
+        self.assertEqual([ticker for ticker, result, error in results], ["CBA"])
+
+        self.scheduler.remove("BHP")
+        self.now += pyasx.scheduler.TIERS["medium"]
+        results = self.scheduler.run_pending()
+        self.assertEqual([ticker for ticker, result, error in results], ["CBA"])
+        self.assertFalse("BHP" in self.scheduler)
+
+
+    def testRunPendingErrors(self):
+        """
+        Unit test for pyasx.scheduler.SweepScheduler.run_pending()
+        Test unexpected errors are returned & the ticker rescheduled
+        """
+
+        self.scheduler.add("BAD", staleness=60)
+        self.scheduler.add("CBA", tier="high")
+
+        results = self.scheduler.run_pending()
+        self.assertEqual([ticker for ticker, result, error in results], ["BAD", "CBA"])
+        self.assertTrue(isinstance(results[0][2], ValueError))
+        self.assertEqual(results[1][1]["ticker"], "CBA")
+
+        self.assertTrue("BAD" in self.scheduler)
+
+        self.now += 60
+        results = self.scheduler.run_pending()
+        self.assertEqual([ticker for ticker, result, error in results], ["CBA", "BAD"])
@@ -0,0 +1,150 @@
+
+
+import threading
+import unittest
+import unittest.mock
+import pyasx.cache
+import pyasx.client
+import pyasx.data
+import pyasx.data.companies
+import pyasx.data.securities
+import pyasx.server
+
+
+class ServerTest(unittest.TestCase):
+    """
+    Unit tests for pyasx.server module
+    """
+
+
+    def setUp(self):
+
+        self.upstream = unittest.mock.Mock()
+        self.upstream.get.side_effect = self.upstreamGet
+
+        upstream_client = pyasx.client.Client(session=self.upstream, cache=pyasx.cache.TTLCache(ttl=60))
+
+        self.server = pyasx.server.MirrorServer(('127.0.0.1', 0), upstream_client, requests_per_second=1000)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+        # consumer pulling via the mirror
+        self.client = pyasx.client.Client()
+
+        base_url = "http://127.0.0.1:%s" % self.server.server_address[1]
+        for key, endpoint in pyasx.server.mirror_endpoints(base_url, upstream_client).items():
+            self.client.set(key, endpoint)
+
+
+    def tearDown(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+    def upstreamGet(self, url):
+
+        response = unittest.mock.Mock()
+        response.headers = { "Content-Type": "application/json" }
+
+        if url == "https://www.asx.com.au/asx/1/share/CBA":
+            response.status_code = 200
+            response.content = b'{"code": "CBA", "last_price": 79.5}'
+        elif url.startswith("https://www.asx.com.au/asx/1/company/CBA?fields="):
+            response.status_code = 200
+            response.content = b'{"code": "CBA", "name_full": "COMMONWEALTH BANK OF AUSTRALIA.", "primary_share": {"code": "CBA"}}'
+        elif url == "https://www.asx.com.au/asx/research/ASXListedCompanies.csv":
+            response.status_code = 200
+            response.headers = { "Content-Type": "text/csv" }
+            response.content = b"\n\n\nCOMMONWEALTH BANK OF AUSTRALIA.,CBA,Banks\n"
+        elif url == "https://www.asx.com.au/asx/1/share/BHP":
+            response.status_code = 503
+            response.content = b""
+        else:
+            response.status_code = 404
+            response.content = b'{"error_code": "404"}'
+
+        return response
+
+
+    def testMirror(self):
+        """
+        Unit test for pyasx.server.MirrorServer
+        Test lookups via the mirror share its cached upstream requests
+        """
+
+        results = []
+
+        def lookup():
+            results.append(pyasx.data.securities.get_security_info("CBA", client=self.client))
+
+        threads = [threading.Thread(target=lookup) for i in range(0, 8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result["last_price"] == 79.5 for result in results))
+        self.assertEqual(self.upstream.get.call_count, 1)
+
+        company = pyasx.data.companies.get_company_info("CBA", client=self.client, sections=["last_dividend"])
+        self.assertEqual(company["name"], "COMMONWEALTH BANK OF AUSTRALIA.")
+        self.assertEqual(self.upstream.get.call_args[0][0], "https://www.asx.com.au/asx/1/company/CBA?fields=last_dividend")
+
+        companies = pyasx.data.companies.get_listed_companies(client=self.client)
+        self.assertEqual(companies, [{ "name": "COMMONWEALTH BANK OF AUSTRALIA.", "ticker": "CBA", "gics_industry": "Banks" }])
+
+
+    def testErrors(self):
+        """
+        Unit test for pyasx.server.MirrorServer
+        Test upstream 404s are passed through & other errors aren't cached
+        """
+
+        self.assertRaises(pyasx.data.UnknownTickerException, pyasx.data.securities.get_security_info, "NAB", client=self.client)
+        self.assertRaises(pyasx.data.UnknownTickerException, pyasx.data.securities.get_security_info, "NAB", client=self.client)
+        self.assertEqual(self.upstream.get.call_count, 1)
+
+        self.assertRaises(pyasx.data.LookupError, pyasx.data.securities.get_security_info, "BHP", client=self.client)
+        self.assertRaises(pyasx.data.LookupError, pyasx.data.securities.get_security_info, "BHP", client=self.client)
+        self.assertEqual(self.upstream.get.call_count, 3)
+
+        import requests
+
+        response = requests.get("http://127.0.0.1:%s/not/an/endpoint" % self.server.server_address[1])
+        self.assertEqual(response.status_code, 404)
+
+
+    def testUpstreamUrl(self):
+        """
+        Unit test for pyasx.server.MirrorServer.upstream_url()
+        Test only the endpoint's query parameters are passed on, sorted
+        """
+
+        self.assertEqual(
+            self.server.upstream_url("/asx/1/share/CBA?cache_buster=1"),
+            "https://www.asx.com.au/asx/1/share/CBA"
+        )
+        self.assertEqual(
+            self.server.upstream_url("/asx/1/company/CBA/announcements?market_sensitive=true&x=1&count=20"),
+            "https://www.asx.com.au/asx/1/company/CBA/announcements?count=20&market_sensitive=true"
+        )
+        self.assertIsNone(self.server.upstream_url("/asx/1/share/CBA/extra"))
+
+
+    def testRateLimiter(self):
+        """
+        Unit test for pyasx.server.RateLimiter
+        """
+
+        now = [1000.0]
+        sleeps = []
+
+        limiter = pyasx.server.RateLimiter(requests_per_second=4, clock=lambda: now[0], sleep=sleeps.append)
+
+        for i in range(0, 3):
+            limiter.acquire()
+
+        self.assertEqual(sleeps, [0.25, 0.5])
@@ -22,11 +22,16 @@ setuptools.setup(
     packages=setuptools.find_packages(
         exclude=['tests',]
     ),
-    package_data={'pyasx': ['*.yml']},
+    entry_points={
+        'console_scripts': ['pyasx = pyasx.cli:main']
+    },
     python_requires='>=2.6',
     install_requires=[
         'requests',
         'pyyaml',
         'python-dateutil'
-    ]
+    ],
+    extras_require={
+        'screener': ['numpy']
+    }
 )
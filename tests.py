@@ -2,13 +2,41 @@
 
 
 import unittest
+import pyasx.tests.cache
+import pyasx.tests.cli
+import pyasx.tests.client
+import pyasx.tests.config
+import pyasx.tests.data.bars
 import pyasx.tests.data.companies
+import pyasx.tests.data.documents
+import pyasx.tests.data.history
+import pyasx.tests.data.indices
+import pyasx.tests.data.screener
+import pyasx.tests.data.search
 import pyasx.tests.data.securities
+import pyasx.tests.data.snapshots
+import pyasx.tests.data.universe
+import pyasx.tests.scheduler
+import pyasx.tests.server
 
 
 test_modules = [
+    pyasx.tests.cache,
+    pyasx.tests.cli,
+    pyasx.tests.client,
+    pyasx.tests.config,
+    pyasx.tests.data.bars,
     pyasx.tests.data.companies,
-    pyasx.tests.data.securities
+    pyasx.tests.data.documents,
+    pyasx.tests.data.history,
+    pyasx.tests.data.indices,
+    pyasx.tests.data.screener,
+    pyasx.tests.data.search,
+    pyasx.tests.data.securities,
+    pyasx.tests.data.snapshots,
+    pyasx.tests.data.universe,
+    pyasx.tests.scheduler,
+    pyasx.tests.server
 ]
 
 # build the test suite automatically based on the configured test_modules above